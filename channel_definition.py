@@ -0,0 +1,297 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Channel rack mode: the track slots of the device show the channels of the channel rack in banks of eight.
+"""
+
+import channels
+import midi
+import ui
+
+import config
+import host_snapshot
+import message_queue
+import nihia.mixer
+from mixer_definition import TRACK_SLOTS, FIELD_NAME, FIELD_VOL, FIELD_PAN, FIELD_SEL, FIELD_SOLO, FIELD_MUTE, \
+    CLEARED, BankMap, MixerShadow, TrackStates, clearSlot, panToString, queueSteps, applySteps
+
+# Channel fields, using the same bits as the track fields
+CHANNEL_FIELDS = FIELD_NAME | FIELD_VOL | FIELD_PAN | FIELD_SEL | FIELD_SOLO | FIELD_MUTE
+
+# FL Studio getter of every channel field
+CHANNEL_GETTERS = {
+    FIELD_NAME: channels.getChannelName,
+    FIELD_VOL: channels.getChannelVolume,
+    FIELD_PAN: channels.getChannelPan,
+    FIELD_SEL: channels.isChannelSelected,
+    FIELD_SOLO: channels.isChannelSolo,
+    FIELD_MUTE: channels.isChannelMuted,
+}
+
+# OnRefresh flags that report changes on the channel rack
+# FL Studio doesn't tell which channel changed, so every channel gets read again the next time it's shown
+CHANNEL_EVENT_FLAGS = midi.HW_ChannelEvent
+
+# OnRefresh flags that report a change of the selected channel, which only makes the selection states be read again
+CHANNEL_SELECTION_FLAGS = midi.HW_Dirty_FocusedWindow
+
+# OnRefresh flags that report a change of the channel rack group being shown, which changes the channel every index
+# refers to and the amount of channels
+CHANNEL_GROUP_FLAGS = midi.HW_Dirty_ChannelRackGroup
+
+# Every OnRefresh flag the channel rack mode handles
+CHANNEL_FLAGS = CHANNEL_EVENT_FLAGS | CHANNEL_SELECTION_FLAGS | CHANNEL_GROUP_FLAGS
+
+# Range of the volume and the pan of a channel
+CHANNEL_RANGES = {
+    "VOLUME": (0.0, 1.0),
+    "PAN": (-1.0, 1.0),
+}
+
+def channelVolToString(value: float) -> str:
+    """ Returns the string shown on the device for a channel volume, from 0 to 1, as FL Studio shows it. """
+    return str(round(value * 100)) + "%"
+
+class ChannelRack:
+    """ Channel rack on the device, shown in banks of channels the same way as the mixer.
+
+    Channels are read into a copy of the channel rack (a `MixerShadow` with the channel getters) and only read again
+    after OnRefresh reports CHANNEL_FLAGS, so switching between the mixer and the channel rack, or between banks of
+    channels, paints from the copy. What the device shows is kept on `TrackStates` and only the differences get sent.
+    """
+    def __init__(self):
+        # Whether the device is showing the channel rack instead of the mixer
+        self.visible = False
+
+        # Groups the channel rack is divided in, built on `resize()`
+        self.channelCount = 0
+        self.banks = BankMap()
+
+        # Whether channels may have been added or removed since the amount of channels was last read
+        self.channelCountStale = False
+
+        # Bank being shown, its first channel and amount of channels
+        self.bank = None
+        self.channelFirst = 0
+        self.channelLimit = 0
+
+        # Copy of every channel of the channel rack
+        self.shadow = MixerShadow(CHANNEL_GETTERS)
+
+        # What the device shows on every track slot while visible
+        self.states = TrackStates(TRACK_SLOTS)
+
+        # Volume and pan changes made with the knobs that are waiting to be applied, as
+        # {(channel, dataType): [[step, count], ...]}, with a run of steps of the same size and direction per item
+        self.changes = {}
+
+        self.resize(channels.channelCount())
+
+    def resize(self, channelCount: int):
+        """ Rebuilds the banks and the channel rack copy for the given amount of channels. """
+        self.channelCount = channelCount
+        self.banks.build(channelCount, TRACK_SLOTS, 0, channelCount)
+        self.shadow.resize(channelCount)
+        self.bank = None
+
+    def invalidate(self, flag: int):
+        """ Marks what OnRefresh reports may have changed on the channels to be read again the next time it's shown, and
+        updates the bank being shown.
+        """
+        if flag & CHANNEL_GROUP_FLAGS:
+            # Indexes refer to other channels now, so the banks are rebuilt and the changes waiting for them dropped
+            self.resize(host_snapshot.get(channels.channelCount))
+            self.channelCountStale = False
+            self.changes.clear()
+
+        elif flag & CHANNEL_EVENT_FLAGS:
+            self.shadow.markAllStale(CHANNEL_FIELDS)
+            self.channelCountStale = True
+
+        else:
+            self.shadow.markAllStale(FIELD_SEL)
+
+        self.update()
+
+    def show(self):
+        """ Makes the device show the channel rack. The mixer has to be hidden first. """
+        self.visible = True
+        self.states.reset()
+        self.bank = None
+        self.update()
+
+    def hide(self):
+        self.visible = False
+        self.changes.clear()
+
+    def update(self):
+        """ Updates the bank of channels the selected channel belongs to on the device. """
+        if not self.visible:
+            return
+
+        states = self.states
+
+        if self.channelCountStale:
+            self.channelCountStale = False
+
+            channelCount = host_snapshot.get(channels.channelCount)
+            if channelCount != self.channelCount:
+                self.resize(channelCount)
+
+        # Switches to the bank of the selected channel
+        selectedChannel = host_snapshot.get(channels.selectedChannel)
+        if 0 <= selectedChannel < self.channelCount:
+            bank = self.banks.bankOf[selectedChannel]
+        else:
+            bank = self.bank if self.bank is not None else 0
+
+        if bank != self.bank:
+            self.bank = bank
+
+            if self.channelCount > 0:
+                self.channelFirst = self.banks.first[bank]
+                self.channelLimit = self.banks.size[bank]
+            else:
+                self.channelFirst = self.channelLimit = 0
+
+            # Updates FL Studio channel rack rectangle halo
+            if config.MIXER_HALO_BEHAVIOR == 1 and self.channelLimit > 0:
+                ui.crDisplayRect(0, self.channelFirst, midi.MaxInt, self.channelLimit, config.MIXER_HALO_TIME)
+
+        shadow = self.shadow
+
+        for slot in range(TRACK_SLOTS):
+            # Slots the bank doesn't fill, cleared unless they already are
+            if slot >= self.channelLimit:
+                if states.index[slot] != CLEARED:
+                    clearSlot(states, slot)
+                continue
+
+            index = states.index[slot] = self.channelFirst + slot
+
+            if states.exist[slot] != 1:
+                states.exist[slot] = 1
+                message_queue.queue(nihia.mixer.setTrackExist, slot, 1)
+
+            # Name
+            name = shadow.get(FIELD_NAME, index)
+            if name != states.name[slot]:
+                states.name[slot] = name
+                message_queue.queue(nihia.mixer.setTrackName, slot, name)
+
+            # Volume and volume graph
+            vol = shadow.get(FIELD_VOL, index)
+            if vol != states.vol[slot]:
+                states.vol[slot] = vol
+                message_queue.queue(nihia.mixer.setTrackVol, slot, channelVolToString(vol))
+                message_queue.queue(nihia.mixer.setTrackVolGraph, slot, vol)
+
+            # Pan and pan graph
+            pan = shadow.get(FIELD_PAN, index)
+            if pan != states.pan[slot]:
+                states.pan[slot] = pan
+                message_queue.queue(nihia.mixer.setTrackPan, slot, panToString(pan))
+                message_queue.queue(nihia.mixer.setTrackPanGraph, slot, pan)
+
+            # Channels can't be armed for recording
+            if states.armed[slot] != 0:
+                states.armed[slot] = 0
+                message_queue.queue(nihia.mixer.setTrackArm, slot, 0)
+
+            # Selection state
+            selected = shadow.get(FIELD_SEL, index)
+            if selected != states.selected[slot]:
+                states.selected[slot] = selected
+                message_queue.queue(nihia.mixer.setTrackSel, slot, selected)
+
+            # Solo state
+            solo = shadow.get(FIELD_SOLO, index)
+            if solo != states.solo[slot]:
+                states.solo[slot] = solo
+                message_queue.queue(nihia.mixer.setTrackSolo, slot, solo)
+
+            # Mute state
+            muted = shadow.get(FIELD_MUTE, index)
+            if muted != states.muted[slot]:
+                states.muted[slot] = muted
+                message_queue.queue(nihia.mixer.setTrackMute, slot, muted)
+
+    def adjust(self, knob: int, dataType: str, step: float, count: int):
+        """ Schedules `count` steps of size `step` (negative count to decrease) of the volume (VOLUME) or pan (PAN) of
+        the channel shown on a knob, applied on the next call to `applyChanges()`.
+        """
+        if knob >= self.channelLimit:
+            return
+
+        queueSteps(self.changes.setdefault((self.channelFirst + knob, dataType), []), step, count)
+
+    def applyChanges(self):
+        """ Applies the changes accumulated by `adjust()` since the last call, writing each parameter of each channel
+        only once.
+
+        The result is the same as applying every step on its own (see `mixer_definition.applySteps()`).
+        """
+        if not self.changes:
+            return
+
+        written = False
+
+        for (channel, dataType), runs in self.changes.items():
+            if dataType == "VOLUME":
+                value = host_snapshot.get(channels.getChannelVolume, channel)
+            else:
+                value = host_snapshot.get(channels.getChannelPan, channel)
+
+            value = applySteps(value, runs, *CHANNEL_RANGES[dataType])
+
+            if value is None:
+                continue
+
+            if dataType == "VOLUME":
+                channels.setChannelVolume(channel, value)
+            else:
+                channels.setChannelPan(channel, value)
+
+            written = True
+
+        self.changes.clear()
+
+        # Values read before the changes aren't valid anymore
+        if written:
+            host_snapshot.reset()
+
+    def command(self, action: str, slot: int):
+        """ Mutes (MUTE), solos (SOLO) or selects (TRACK_SELECTION) the channel shown on a slot. """
+        if slot >= self.channelLimit:
+            return
+
+        channel = self.channelFirst + slot
+
+        if action == "MUTE":
+            channels.muteChannel(channel)
+
+        elif action == "SOLO":
+            channels.soloChannel(channel)
+
+        elif action == "TRACK_SELECTION":
+            channels.selectOneChannel(channel)
@@ -44,6 +44,28 @@ COUNT_IN_BEHAVIOR = 0
 KNOB_INCREMENTS_VOL = 0.02
 KNOB_INCREMENTS_PAN = 0.02
 
+# 4D Encoder increments
+# These values set the amount of increments for each step of the 4D Encoder when it changes the volume and pan of the
+# selected mixer track. Turning it fast makes each step worth more (see ENCODER_ACCELERATION)
+# Defaults are:
+# - ENCODER_INCREMENTS_VOL = 0.01
+# - ENCODER_INCREMENTS_PAN = 0.01
+ENCODER_INCREMENTS_VOL = 0.01
+ENCODER_INCREMENTS_PAN = 0.01
+
+# 4D Encoder jog unit
+# Amount the song position moves on each step of the 4D Encoder while the piano roll or the playlist are focused
+# - If set to 0, it moves by bars
+# - If set to 1 (default), it moves by beats
+# - If set to 2, it moves by ticks
+JOG_UNIT = 1
+
+# 4D Encoder acceleration
+# Maximum amount of steps a single step of the 4D Encoder can be worth when turning it fast. Set it to 1 to make every
+# step of the 4D Encoder worth one step no matter how fast it's turned
+# Default value: 8
+ENCODER_ACCELERATION = 8
+
 # Quantize button behavior
 # - If set to 0 (default), it will serve as a quantize buttom for the notes the currently selected pattern and currently
 #   selected channel rack
@@ -66,3 +88,100 @@ MIXER_HALO_BEHAVIOR = 1
 # Specify midi.MaxInt as value to make the mixer halo not disappear
 # Default value: 3000
 MIXER_HALO_TIME = 3000
+
+# Mixer banks
+# The device shows the mixer in groups (banks) of MIXER_BANK_SIZE tracks, from 1 to 8, with the first group starting on
+# the mixer track MIXER_BANK_OFFSET. For example, setting the offset to 1 leaves the master track out of the groups
+# Defaults are:
+# - MIXER_BANK_SIZE = 8
+# - MIXER_BANK_OFFSET = 0
+MIXER_BANK_SIZE = 8
+MIXER_BANK_OFFSET = 0
+
+# Mixer repaint budget
+# When the device switches to another group of mixer tracks, the names and selection of every track and the whole
+# selected track get sent at once, and the rest of the display gets sent over the next idle ticks of FL Studio,
+# spending at most this amount of microseconds on each tick. Set it to 0 to send the whole display at once
+# Default value: 500
+MIXER_REPAINT_BUDGET = 500
+
+# Mixer prefetch budget
+# The script keeps a copy of the whole FL Studio mixer and, while FL Studio is idle, reads into it the groups of tracks
+# next to the one being shown, so switching to them doesn't have to wait for FL Studio. This is the maximum amount of
+# microseconds spent on it on each idle tick. Set it to 0 to read tracks only when they are shown
+# Default value: 200
+MIXER_PREFETCH_BUDGET = 200
+
+# Plugin control mode
+# - If set to 0 (default), the knobs always control the mixer
+# - If set to 1, while a plugin window is focused the device shows the parameters of that plugin (the generator of a
+#   channel or an effect of a mixer track), 8 at a time, and the knobs control them. Moving the 4D Encoder left and
+#   right changes the page of parameters being shown
+PLUGIN_CONTROL = 0
+
+# Plugin knob increments (only matters if PLUGIN_CONTROL is set to 1)
+# Amount of increments for each message your keyboard sends to FL Studio when twisting the knobs on your device to
+# change a plugin parameter, which goes from 0 to 1
+# Default value: 0.01
+PLUGIN_KNOB_INCREMENTS = 0.01
+
+# Channel rack mode
+# - If set to 0 (default), the device always shows the mixer
+# - If set to 1, while the channel rack is focused the device shows its channels instead of the mixer tracks,
+#   in groups of 8 starting from the first channel, and the knobs change their volume (or pan, while holding SHIFT) with
+#   the same increments as on the mixer
+CHANNEL_RACK_CONTROL = 0
+
+# Peak meter refresh rate (only for S-Series MK2 keyboards)
+# Maximum amount of times per second the peak meters on the device get updated while FL Studio is playing and while
+# it is stopped. Peaks happening between two updates are held until the next one, so short transients still show up
+# at low refresh rates. Set it to 0 to update the peak meters every time FL Studio reports new values
+# Defaults are:
+# - PEAK_METER_RATE = 30
+# - PEAK_METER_RATE_STOPPED = 10
+PEAK_METER_RATE = 30
+PEAK_METER_RATE_STOPPED = 10
+
+# Peak meter decay (only for S-Series MK2 keyboards)
+# Speed at which the peak meters on the device fall after a peak, in meter steps per second (the meters have 127 steps)
+# Default value: 400
+PEAK_METER_DECAY = 400
+
+# Callback profiler
+# - If set to 0 (default), the script runs without any instrumentation
+# - If set to 1, the script measures how long every callback and every button and knob handler takes and shows a summary
+#   when the script is closed (for example, when closing FL Studio or reloading the script)
+PROFILER = 0
+
+# Profiler output (only matters if PROFILER is set to 1)
+# Path of the file the profiler summary gets written to. If left empty (default), the summary is printed on the
+# script output window of FL Studio
+PROFILER_OUTPUT = ""
+
+# Idle polling intervals
+# Time in seconds between two checks of state FL Studio doesn't notify the script about: the focused window (for the
+# CLEAR button light) and the Komplete Kontrol instance loaded on the selected channel. Set them to 0 to check on
+# every idle tick of FL Studio
+# Defaults are:
+# - FOCUS_POLL_INTERVAL = 0.1
+# - KOMPLETE_POLL_INTERVAL = 0.25
+FOCUS_POLL_INTERVAL = 0.1
+KOMPLETE_POLL_INTERVAL = 0.25
+
+# Session recorder
+# - If set to 0 (default), nothing gets recorded
+# - If set to 1, the script records every MIDI message it receives and every callback FL Studio calls, and writes the
+#   recording to a file when the script is closed. Recordings can be replayed outside of FL Studio with tools/replay.py
+#   to measure how the script performs on a real session
+RECORDER = 0
+
+# Recorder output (only matters if RECORDER is set to 1)
+# Path of the file the recording gets written to. If left empty (default), it gets written as session.kkrec on the
+# folder of the script
+RECORDER_OUTPUT = ""
+
+# Recorder size (only matters if RECORDER is set to 1)
+# Maximum amount of MIDI messages and callbacks kept on the recording. Once reached, the oldest ones get overwritten.
+# Each one takes 16 bytes of memory
+# Default value: 200000
+RECORDER_SIZE = 200000
@@ -21,6 +21,12 @@
 # SOFTWARE.
 
 import mixer_definition
+import plugin_definition
+import channel_definition
+import led_definition
+import idle_scheduler
+import host_snapshot
+import message_queue
 import nihia
 from nihia import *
 import config
@@ -33,14 +39,40 @@ import device
 import midi
 import plugins
 import channels
-import math
+import time
+
+# Time in seconds between two messages of the same encoder turning in the same direction below which each message is
+# worth more than one step. Messages twice as close are worth two steps, three times as close three steps and so on, up
+# to ENCODER_ACCELERATION on the config file
+ENCODER_ACCELERATION_TIME = 0.05
+
+# Range of the volume and the pan of a mixer track
+MIXER_RANGES = {
+    "VOLUME": (0.0, 1.0),
+    "PAN": (-1.0, 1.0),
+}
 
 class Core:
     """ Common controller definition across all Komplete Kontrol keyboards. """
+
+    # Device capabilities, set by every child
+    # Peak meters on the display
+    HAS_METERS = False
+    # Buttons to select each of the 8 tracks being shown
+    HAS_TRACK_SELECT = False
+    # Mute and solo buttons for each of the 8 tracks being shown, instead of only for the selected track
+    HAS_MULTI_MUTE = False
+
     def __init__(self):
         # Initialize mixer cache
         self.mixer = mixer_definition.Mixer()
 
+        # Plugin control mode, which uses the track slots of the device instead of the mixer while a plugin is focused
+        self.plugin = plugin_definition.PluginControl()
+
+        # Channel rack mode, which uses the track slots of the device instead of the mixer while the channel rack is focused
+        self.channelRack = channel_definition.ChannelRack()
+
         # Variable for the window change produced by the Quantize button
         self.window = -1
 
@@ -48,27 +80,48 @@ class Core:
         self.window2 = 63
 
         # Button light states
-        self.PLAY           = None
-        self.STOP           = None
-        self.REC            = None
-        self.COUNT_IN       = None
-        self.CLEAR          = None
-        self.LOOP           = None
-        self.METRO          = None
-        self.TEMPO          = None
-
-        self.UNDO           = None
-        self.REDO           = None
-        self.QUANTIZE       = None
-        self.AUTO           = None
-
-        self.MUTE_SELECTED  = None
-        self.SOLO_SELECTED  = None
+        self.lights = led_definition.Lights()
+
+        # Mixer volume and pan changes made with the knobs and the 4D Encoder that are waiting to be applied, as
+        # {(track, dataType): [[step, count], ...]}, with a run of steps of the same size and direction per item
+        self.mixerChanges = {}
+
+        # Time and direction of the last message of every encoder, for acceleration, as {encoder: (time, direction)}
+        self.encoderEvents = {}
+
+        # Song position jog steps made with the 4D Encoder that are waiting to be applied
+        self.jogSteps = 0
+
+        # MIDI dispatch table mapping (data1, data2) to the handler of the message
+        self.midiHandlers = {}
+        self.registerMidiHandlers()
+
+        # Additional controller-dependent handlers
+        try:
+            self.registerMidiHandlersAdd()
+        except NotImplementedError:
+            pass
+
+        # Work done on OnIdle, each part at its own interval
+        self.idleScheduler = idle_scheduler.Scheduler()
+        self.registerIdlePollers()
+
+        # OnRefresh router: parts of the script to update for the bits of the flag, as (bitmask, method(flag))
+        self.refreshRoutes = []
+        self.registerRefreshRoutes()
 
     def OnInit(self):
         # Activates the deep integration mode
         nihia.handShake()
 
+        # The display and the lights of the device start empty after the handshake
+        message_queue.forget()
+        self.lights.forget()
+
+        # Tells to FL Studio the device has peak meters
+        if self.HAS_METERS:
+            device.setHasMeters()
+
         # Additional controller-dependent code
         try:
             self.OnInitAdd()
@@ -77,15 +130,20 @@ class Core:
 
         # Update LEDs
         self.OnRefresh(midi.HW_Dirty_LEDs)
-        self.OnRefresh(260)
 
-        nihia.buttons.setLight("QUANTIZE", 1)
-        nihia.buttons.setLight("AUTO", 0)
-        nihia.buttons.setLight("TEMPO", 1)
+        self.lights.state[led_definition.QUANTIZE] = 1
+        self.lights.state[led_definition.AUTO] = 0
+        self.lights.state[led_definition.TEMPO] = 1
+        self.lights.send()
 
         # Update mixer
         self.mixer.update()
 
+        # Runs every idle poller once so the device doesn't wait for their intervals
+        self.idleScheduler.run(force=True)
+
+        message_queue.flush()
+
     def OnInitAdd(self):                # Intended to be declared by child
         raise NotImplementedError()
 
@@ -94,51 +152,33 @@ class Core:
         nihia.goodBye()
 
     def OnMidiMsg(self, event):
-        # Play button
-        if event.data1 == nihia.buttons.button_list.get("PLAY"):
+        host_snapshot.reset()
+
+        # Looks up the handler of the incoming message on the dispatch table built on init
+        handler = self.midiHandlers.get((event.data1, event.data2))
+
+        if handler is not None:
             event.handled = True
-            transport.start()
+            handler(event)
+
+        message_queue.flush()
+
+    def registerMidiHandlers(self):
+        """ Builds the part of the MIDI dispatch table that is common across all Komplete Kontrol keyboards. """
+        # Play button
+        self.registerMidiHandler("PLAY", lambda event: transport.start())
 
         # Restart button
-        elif event.data1 == nihia.buttons.button_list.get("RESTART"):
-            event.handled = True
-            transport.setLoopMode()
+        self.registerMidiHandler("RESTART", lambda event: transport.setLoopMode())
 
         # Record button
-        elif event.data1 == nihia.buttons.button_list.get("REC"):
-            event.handled = True
-            transport.record()
-        
+        self.registerMidiHandler("REC", lambda event: transport.record())
+
         # Count-In button
-        elif event.data1 == nihia.buttons.button_list.get("COUNT_IN"):
-            event.handled = True
-            
-            # Defines the standard behavior (just to toggle "Countdown before recording" on/off)
-            if config.COUNT_IN_BEHAVIOR == 0:
-                transport.globalTransport(midi.FPT_CountDown, 1)
-            
-            # Defines behavior of the button if the user chooses the Maschine-alike behavior
-            if config.COUNT_IN_BEHAVIOR == 1:
-        
-                # Toggles recording on if it isn't enabled already
-                if transport.isRecording() == 0:
-                    transport.record()
-                
-                # Toggles countdown before recording on if it isn't enabled already
-                if ui.isPrecountEnabled() == 0:
-                    transport.globalTransport(midi.FPT_CountDown, 1)
-                
-                # Stops playback if FL Studio is playing
-                if transport.isPlaying() == True:
-                    transport.stop()
-                
-                # Then turns playback on again. This time record and countdown before recording will be activated
-                transport.start()
+        self.registerMidiHandler("COUNT_IN", self.countIn)
 
         # Stop button
-        elif event.data1 == nihia.buttons.button_list.get("STOP"):
-            event.handled = True
-            transport.stop()
+        self.registerMidiHandler("STOP", lambda event: transport.stop())
 
         # Clear button
         # This one in other DAWs (in Maschine, specifically) this button is meant to clear the MIDI clip you're
@@ -147,41 +187,27 @@ class Core:
         #
         # However, since the MIDI API on FL Studio doesn't allow control over the piano roll specifically, for now it will only just
         # emulate the delete button (which does the same)
-        elif event.data1 == nihia.buttons.button_list.get("CLEAR"):
-            event.handled = True
-            ui.delete()
-        
+        self.registerMidiHandler("CLEAR", lambda event: ui.delete())
+
         # Loop button (toggles loop recording on/off)
-        elif event.data1 == nihia.buttons.button_list.get("LOOP"):
-            event.handled = True
-            transport.globalTransport(midi.FPT_LoopRecord, 1)
+        self.registerMidiHandler("LOOP", lambda event: transport.globalTransport(midi.FPT_LoopRecord, 1))
 
         # Metronome button
-        elif event.data1 == nihia.buttons.button_list.get("METRO"):
-            event.handled = True
-            transport.globalTransport(midi.FPT_Metronome, 1)
-        
-        # Tempo button
-        elif event.data1 == nihia.buttons.button_list.get("TEMPO"):
-            event.handled = True
-            transport.globalTransport(midi.FPT_TapTempo, 1)
+        self.registerMidiHandler("METRO", lambda event: transport.globalTransport(midi.FPT_Metronome, 1))
 
+        # Tempo button
+        self.registerMidiHandler("TEMPO", lambda event: transport.globalTransport(midi.FPT_TapTempo, 1))
 
         # Undo button
-        elif event.data1 == nihia.buttons.button_list.get("UNDO"):
-            event.handled = True
-            general.undoUp()
-        
+        self.registerMidiHandler("UNDO", lambda event: general.undoUp())
+
         # Redo button
-        elif event.data1 == nihia.buttons.button_list.get("REDO"):
-            event.handled = True
-            general.undoDown()
+        self.registerMidiHandler("REDO", lambda event: general.undoDown())
 
-        
         # Quantize button
-        elif (event.data1 == nihia.buttons.button_list.get("QUANTIZE")) and (config.QUANTIZE_BEHAVIOR == 0):
-            event.handled = True
-            channels.quickQuantize(channels.selectedChannel(), config.QUANTIZE_MODE)
+        if config.QUANTIZE_BEHAVIOR == 0:
+            self.registerMidiHandler("QUANTIZE", lambda event: channels.quickQuantize(channels.selectedChannel(), config.QUANTIZE_MODE))
+
         # Instead, it changes between FL windows
         # TODO: The code is correctly written, but the ui.showWindow() method has a bug that causes the Piano roll and Browser windows not to
         # appear when invoked. It has been said it should be fixed in a future update.
@@ -199,223 +225,444 @@ class Core:
         # -----------------------------------------------------------------------------------------------------------------------------------
         # 
         # Alternative implementation: Emulate the Fn buttons
-        elif (event.data1 == nihia.buttons.button_list.get("QUANTIZE")) and (config.QUANTIZE_BEHAVIOR == 1):
-            event.handled = True
-            self.window2 += 1
-
-            # Normal behavior if the action ID is between the desired range
-            if self.window2 <= 68 and self.window2 != 67:
-                transport.globalTransport(self.window2, 1)
-            
-            # Skips the 67 value which calls the full screen plugin picker and calls the mixer instead
-            elif self.window2 == 67:
-                self.window2 += 1
-                transport.globalTransport(self.window2, 1)
-
-            # Once window value is out of range, it sets it again to the first value in range
-            elif self.window2 > 68:
-                self.window2 = 64
-                transport.globalTransport(self.window2, 1)
-
+        elif config.QUANTIZE_BEHAVIOR == 1:
+            self.registerMidiHandler("QUANTIZE", self.switchWindow)
 
         # Automation button
         # Enables and disables the recording automation events
         # TODO: Not implemented yet in FL Studio MIDI API
         # 
         # Instead, it shows the full-screen plugin browser
-        elif event.data1 == nihia.buttons.button_list.get("AUTO"):
-            event.handled = True
-            transport.globalTransport(midi.FPT_F8, 1)
+        self.registerMidiHandler("AUTO", lambda event: transport.globalTransport(midi.FPT_F8, 1))
 
         # 4D Encoder +
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_GENERAL") and event.data2 == nihia.buttons.button_list.get("PLUS"):
-            event.handled = True
-            
-            # Mixer navigation (right)
-            if ui.getFocused(midi.widMixer) == True:
-                ui.right()
-            
-            # Playback jogging
-            elif (ui.getFocused(midi.widPianoRoll) == True) or (ui.getFocused(midi.widPlaylist) == True):
-                transport.setSongPos(transport.getSongPos(midi.SONGLENGTH_S) + 1, midi.SONGLENGTH_S)
+        self.registerMidiHandler("ENCODER_GENERAL", lambda event: self.encoderJog(1), "PLUS")
 
-            # General navigation
-            else:
-                ui.down()
-        
         # 4D Encoder -
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_GENERAL") and event.data2 == nihia.buttons.button_list.get("MINUS"):
-            event.handled = True
-            
-            # Mixer navigation
-            if ui.getFocused(midi.widMixer) == True:
-                ui.left()
+        self.registerMidiHandler("ENCODER_GENERAL", lambda event: self.encoderJog(-1), "MINUS")
 
-            elif (ui.getFocused(midi.widPianoRoll) == True) or (ui.getFocused(midi.widPlaylist) == True):
-                transport.setSongPos(transport.getSongPos(midi.SONGLENGTH_S) - 1, midi.SONGLENGTH_S)
-
-            # General navigation
-            else:
-                ui.up()
-        
         # 4D Encoder + (selected track volume)
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_VOLUME_SELECTED") and event.data2 == nihia.buttons.button_list.get("PLUS"):
-            event.handled = True
-            mixer.setTrackVolume(mixer.trackNumber(), mixer.getTrackVolume(mixer.trackNumber()) + 0.01)
-        
+        self.registerMidiHandler("ENCODER_VOLUME_SELECTED", lambda event: self.adjustSelectedTrack("VOLUME", 1), "PLUS")
+
         # 4D Encoder - (selected track volume)
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_VOLUME_SELECTED") and event.data2 == nihia.buttons.button_list.get("MINUS"):
-            event.handled = True
-            mixer.setTrackVolume(mixer.trackNumber(), mixer.getTrackVolume(mixer.trackNumber()) - 0.01)
+        self.registerMidiHandler("ENCODER_VOLUME_SELECTED", lambda event: self.adjustSelectedTrack("VOLUME", -1), "MINUS")
 
-        
         # 4D Encoder + (selected track pan)
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_PAN_SELECTED") and event.data2 == nihia.buttons.button_list.get("PLUS"):
-            event.handled = True
-            mixer.setTrackPan(mixer.trackNumber(), mixer.getTrackPan(mixer.trackNumber()) + 0.01)
-        
-        # 4D Encoder + (selected track pan)
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_PAN_SELECTED") and event.data2 == nihia.buttons.button_list.get("MINUS"):
-            event.handled = True
-            mixer.setTrackPan(mixer.trackNumber(), mixer.getTrackPan(mixer.trackNumber()) - 0.01)
-        
+        self.registerMidiHandler("ENCODER_PAN_SELECTED", lambda event: self.adjustSelectedTrack("PAN", 1), "PLUS")
+
+        # 4D Encoder - (selected track pan)
+        self.registerMidiHandler("ENCODER_PAN_SELECTED", lambda event: self.adjustSelectedTrack("PAN", -1), "MINUS")
+
         # 4D Encoder button
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_BUTTON"):
-            event.handled = True
+        self.registerMidiHandler("ENCODER_BUTTON", self.encoderButton)
 
-            # Open and close plugin window for the currently selected plugin on the channel rack
-            if ui.getFocused(midi.widChannelRack) == True:
-                channels.showEditor(channels.selectedChannel(), 1)
-            elif ui.getFocused(5) == True:
-                channels.showEditor(channels.selectedChannel(), 0)
-            else:
-                ui.enter()
-        
         # 4D Encoder button (shifted)
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_BUTTON_SHIFTED"):
-            event.handled = True
-            transport.globalTransport(midi.FPT_Menu, 1)
+        self.registerMidiHandler("ENCODER_BUTTON_SHIFTED", lambda event: transport.globalTransport(midi.FPT_Menu, 1))
 
         # Knobs
-        # Normal knobs (volume adjustment)
-
-        elif nihia.mixer.knobs[0][0] <= event.data1 <= nihia.mixer.knobs[0][7]:
-            event.handled = True
+        # Every speed value the keyboard can send gets its own entry, so the direction and the sensitivity of the
+        # movement are resolved here instead of on every message
+        for speed in range(128):
             # Increase
-            if nihia.mixer.KNOB_INCREASE_MIN_SPEED <= event.data2 <= nihia.mixer.KNOB_INCREASE_MAX_SPEED:
-                self.adjustMixer(event.data1 - nihia.mixer.knobs[0][0], "VOLUME", "INCREASE", mixer.trackNumber(), self.normalizeKnobSpeed(event.data2))
-            
+            if nihia.mixer.KNOB_INCREASE_MIN_SPEED <= speed <= nihia.mixer.KNOB_INCREASE_MAX_SPEED:
+                action = "INCREASE"
+
             # Decrease
-            elif nihia.mixer.KNOB_DECREASE_MIN_SPEED >= event.data2 >= nihia.mixer.KNOB_DECREASE_MAX_SPEED:
-                self.adjustMixer(event.data1 - nihia.mixer.knobs[0][0], "VOLUME", "DECREASE", mixer.trackNumber(), self.normalizeKnobSpeed(event.data2))
+            elif nihia.mixer.KNOB_DECREASE_MIN_SPEED >= speed >= nihia.mixer.KNOB_DECREASE_MAX_SPEED:
+                action = "DECREASE"
+
+            else:
+                continue
+
+            for knob in range(8):
+                # Normal knobs (volume adjustment)
+                self.midiHandlers[(nihia.mixer.knobs[0][knob], speed)] = self.knobHandler(knob, "VOLUME", action, self.normalizeKnobSpeed(speed))
+
+                # Shifted knobs (pan adjustment)
+                self.midiHandlers[(nihia.mixer.knobs[1][knob], speed)] = self.knobHandler(knob, "PAN", action, self.normalizeKnobSpeed(speed))
+
+        # Mute and solo buttons
+        if self.HAS_MULTI_MUTE:
+            # Each of the tracks being shown
+            self.registerMidiHandler("MUTE", lambda event: self.mixerCommandHandler("MUTE", event.data2, host_snapshot.get(mixer.trackNumber)))
+            self.registerMidiHandler("SOLO", lambda event: self.mixerCommandHandler("SOLO", event.data2, host_snapshot.get(mixer.trackNumber)))
+
+        else:
+            # Only the selected track
+            self.registerMidiHandler("MUTE_SELECTED", lambda event: mixer.muteTrack(host_snapshot.get(mixer.trackNumber)))
+            self.registerMidiHandler("SOLO_SELECTED", lambda event: mixer.soloTrack(host_snapshot.get(mixer.trackNumber)))
+
+        # Track selection (top white buttons)
+        if self.HAS_TRACK_SELECT:
+            self.registerMidiHandler("TRACK_SELECT", lambda event: self.mixerCommandHandler("TRACK_SELECTION", event.data2, host_snapshot.get(mixer.trackNumber)))
+
+    def mixerCommandHandler(self, action: str, targetTrack: int, selectedTrack: int):
+        """ Handles the mute, solo and track selection buttons of each of the tracks being shown (HAS_MULTI_MUTE and HAS_TRACK_SELECT). 
+        ### Parameters
         
-        # Shifted knobs (pan adjustment)
-        elif nihia.mixer.knobs[1][0] <= event.data1 <= nihia.mixer.knobs[1][7]:
-            event.handled = True
-            # Increase
-            if nihia.mixer.KNOB_INCREASE_MIN_SPEED <= event.data2 <= nihia.mixer.KNOB_INCREASE_MAX_SPEED:
-                self.adjustMixer(event.data1 - nihia.mixer.knobs[1][0], "PAN", "INCREASE", mixer.trackNumber(), self.normalizeKnobSpeed(event.data2))
+        - action: MUTE, SOLO or TRACK_SELECTION.
+        - targetTrack: From 0 to 7, the track that the user is trying to mute or solo from the ones showing on the device's mixer.
+        - selectedTrack: The currently selected track that is used to calculate the track group.
+        """
+        # The track slots show plugin parameters in plugin control mode
+        if self.plugin.visible:
+            return
+
+        # And channels in channel rack mode
+        if self.channelRack.visible:
+            self.channelRack.command(action, targetTrack)
+            return
+
+        # Finds the group the selected track belongs to and its first track
+        banks = self.mixer.banks
+        trackGroup = banks.bankOf[selectedTrack]
+        trackFirst = banks.first[trackGroup]
+
+        # Buttons past the last track of a smaller group
+        if targetTrack >= banks.size[trackGroup]:
+            return
+
+        # Adjusts the correct property of the right track
+        if action == "MUTE":
+            mixer.muteTrack(trackFirst + targetTrack)
+
+        elif action == "SOLO":
+            mixer.soloTrack(trackFirst + targetTrack)
+
+        elif action == "TRACK_SELECTION":
+            mixer.selectTrack(trackFirst + targetTrack)
+
+    def registerMidiHandlersAdd(self):  # Intended to be declared by child
+        raise NotImplementedError()
+
+    def registerMidiHandler(self, button: str, handler, value: str = None):
+        """ Adds a handler to the MIDI dispatch table. Handlers registered later replace the previous ones for the same message.
+        ### Parameters
+
+        - button: Name of the button on `nihia.buttons.button_list` whose value is the DATA1 byte of the message.
+
+        - handler: Function to call with the MIDI event as its only argument.
+
+        - value: Name of the value on `nihia.buttons.button_list` the DATA2 byte has to match (PLUS, MINUS, UP, DOWN, LEFT or RIGHT). 
+        If not specified, the handler will be called for any DATA2 value.
+        """
+        data1 = nihia.buttons.button_list.get(button)
+
+        if value is None:
+            for data2 in range(128):
+                self.midiHandlers[(data1, data2)] = handler
+        else:
+            self.midiHandlers[(data1, nihia.buttons.button_list.get(value))] = handler
+
+    def knobHandler(self, knob: int, dataType: str, action: str, sensitivity: float):
+        """ Returns the MIDI handler for a knob turned in a certain direction and speed. Parameters are the same as `adjustMixer`. """
+        return lambda event: self.adjustKnob(knob, dataType, action, sensitivity)
+
+    def adjustKnob(self, knob: int, dataType: str, action: str, sensitivity: float):
+        """ Adjusts what a knob controls: a parameter of the plugin being shown in plugin control mode, a channel in
+        channel rack mode, or the mixer. Parameters are the same as `adjustMixer`. Shifted knobs control the same plugin
+        parameters as normal ones.
+        """
+        if self.plugin.visible:
+            self.plugin.adjust(knob, config.PLUGIN_KNOB_INCREMENTS * sensitivity, -1 if action == "DECREASE" else 1)
+
+        elif self.channelRack.visible:
+            self.channelRack.adjust(knob, dataType, self.knobStep(dataType, sensitivity),
+                                    -1 if action == "DECREASE" else 1)
+
+        else:
+            self.adjustMixer(knob, dataType, action, host_snapshot.get(mixer.trackNumber), sensitivity)
+
+    def adjustSelectedTrack(self, dataType: str, direction: int):
+        """ Adjusts the volume or pan of the currently selected mixer track with the 4D Encoder.
+        ### Parameters
+
+        - dataType: The parameter you are going to adjust. Can be PAN or VOLUME.
+
+        - direction: 1 for clockwise (+), -1 for counter-clockwise (-).
+        """
+        if dataType == "VOLUME":
+            step = config.ENCODER_INCREMENTS_VOL
+
+        elif dataType == "PAN":
+            step = config.ENCODER_INCREMENTS_PAN
+
+        # The change is accumulated along with the ones made with the knobs and gets applied on the next idle tick
+        count = direction * self.encoderSpeed("SELECTED_" + dataType, direction)
+        self.queueMixerChange(host_snapshot.get(mixer.trackNumber), dataType, step, count)
+
+    def countIn(self, event):
+        # Defines the standard behavior (just to toggle "Countdown before recording" on/off)
+        if config.COUNT_IN_BEHAVIOR == 0:
+            transport.globalTransport(midi.FPT_CountDown, 1)
+        
+        # Defines behavior of the button if the user chooses the Maschine-alike behavior
+        if config.COUNT_IN_BEHAVIOR == 1:
+    
+            # Toggles recording on if it isn't enabled already
+            if transport.isRecording() == 0:
+                transport.record()
             
-            # Decrease
-            elif nihia.mixer.KNOB_DECREASE_MIN_SPEED >= event.data2 >= nihia.mixer.KNOB_DECREASE_MAX_SPEED:
-                self.adjustMixer(event.data1 - nihia.mixer.knobs[1][0], "PAN", "DECREASE", mixer.trackNumber(), self.normalizeKnobSpeed(event.data2))
+            # Toggles countdown before recording on if it isn't enabled already
+            if ui.isPrecountEnabled() == 0:
+                transport.globalTransport(midi.FPT_CountDown, 1)
+            
+            # Stops playback if FL Studio is playing
+            if transport.isPlaying() == True:
+                transport.stop()
+            
+            # Then turns playback on again. This time record and countdown before recording will be activated
+            transport.start()
+
+    def switchWindow(self, event):
+        self.window2 += 1
+
+        # Normal behavior if the action ID is between the desired range
+        if self.window2 <= 68 and self.window2 != 67:
+            transport.globalTransport(self.window2, 1)
         
-        # Additional controller-dependent code
-        try:
-            self.OnMidiMsgAdd(event)
-        except:
-            pass
+        # Skips the 67 value which calls the full screen plugin picker and calls the mixer instead
+        elif self.window2 == 67:
+            self.window2 += 1
+            transport.globalTransport(self.window2, 1)
 
-    def OnMidiMsgAdd(self, event):      # Intended to be declared by child
-        raise NotImplementedError()
+        # Once window value is out of range, it sets it again to the first value in range
+        elif self.window2 > 68:
+            self.window2 = 64
+            transport.globalTransport(self.window2, 1)
+
+    def encoderJog(self, direction: int):
+        """ Handles the spin of the 4D Encoder. 
+        ### Parameters
+
+        - direction: 1 for clockwise (+), -1 for counter-clockwise (-).
+        """
+        # Mixer navigation
+        if host_snapshot.get(ui.getFocused, midi.widMixer) == True:
+            if direction > 0:
+                ui.right()
+            else:
+                ui.left()
+        
+        # Playback jogging
+        # The steps are accumulated and get applied on the next idle tick, so a fast spin results in a single write to
+        # the song position
+        elif (host_snapshot.get(ui.getFocused, midi.widPianoRoll) == True) or (host_snapshot.get(ui.getFocused, midi.widPlaylist) == True):
+            self.jogSteps += direction * self.encoderSpeed("JOG", direction)
+
+        # General navigation
+        else:
+            if direction > 0:
+                ui.down()
+            else:
+                ui.up()
+
+    def encoderSpeed(self, encoder: str, direction: int) -> int:
+        """ Returns how many steps a message of an encoder is worth, depending on how fast the encoder is being turned.
+        ### Parameters
+
+        - encoder: Name of the encoder, to keep track of each one separately.
+
+        - direction: 1 for clockwise (+), -1 for counter-clockwise (-).
+
+        ### Returns
+
+        - From 1 to ENCODER_ACCELERATION on the config file.
+        """
+        now = time.perf_counter()
+        last = self.encoderEvents.get(encoder)
+        self.encoderEvents[encoder] = (now, direction)
+
+        # Turning slowly, changing direction or with acceleration disabled
+        if last is None or last[1] != direction or config.ENCODER_ACCELERATION <= 1:
+            return 1
+
+        elapsed = now - last[0]
+        if elapsed <= 0:
+            return config.ENCODER_ACCELERATION
+
+        return min(max(int(ENCODER_ACCELERATION_TIME / elapsed), 1), config.ENCODER_ACCELERATION)
+
+    def applyJog(self):
+        """ Moves the song position by the jog steps accumulated since the last call, with a single write. """
+        if self.jogSteps == 0:
+            return
+
+        # Ticks of every step
+        if config.JOG_UNIT == 0:
+            unit = host_snapshot.get(general.getRecPPB)
+        elif config.JOG_UNIT == 1:
+            unit = host_snapshot.get(general.getRecPPQ)
+        else:
+            unit = 1
+
+        position = host_snapshot.get(transport.getSongPos, midi.SONGLENGTH_ABSTICKS) + self.jogSteps * unit
+        transport.setSongPos(max(position, 0), midi.SONGLENGTH_ABSTICKS)
+
+        self.jogSteps = 0
+
+        # The song position changed
+        host_snapshot.reset()
+
+    def encoderX(self, direction: int):
+        """ Handles the 4D Encoder being moved left (-1) or right (1), which changes the page of parameters in plugin
+        control mode and moves through FL Studio otherwise.
+        """
+        if self.plugin.visible:
+            self.plugin.changePage(direction)
+
+        # mixer.setTrackNumber() isn't used on the mixer since it doesn't move the mixer view as you get to the border
+        elif direction > 0:
+            ui.right()
+        else:
+            ui.left()
+
+    def encoderButton(self, event):
+        # Open and close plugin window for the currently selected plugin on the channel rack
+        if host_snapshot.get(ui.getFocused, midi.widChannelRack) == True:
+            channels.showEditor(channels.selectedChannel(), 1)
+        elif host_snapshot.get(ui.getFocused, 5) == True:
+            channels.showEditor(channels.selectedChannel(), 0)
+        else:
+            ui.enter()
 
     def OnIdle(self):
-        # Updates the LED of the CLEAR button (moved to OnIdle, since OnRefresh isn't called when focused window changes)
-        if ui.getFocused(midi.widPianoRoll) != self.CLEAR:
-            self.CLEAR = ui.getFocused(midi.widPianoRoll)
-            nihia.buttons.setLight("CLEAR", ui.getFocused(midi.widPianoRoll))
+        host_snapshot.reset()
 
-    def OnRefresh(self, flag):
-        # LEDs update
-        if flag == midi.HW_Dirty_LEDs:
-            # PLAY button
-            if transport.isPlaying() != self.PLAY:
-                self.PLAY = transport.isPlaying()
-
-                # Handle transport.isPlaying() exception returning 2 when recording countdown is happening
-                if transport.isPlaying() == 2:
-                    nihia.buttons.setLight("PLAY", 0)
-                else:
-                    nihia.buttons.setLight("PLAY", transport.isPlaying())
-
-            # STOP button
-            if (not transport.isPlaying()) != self.STOP:
-                self.STOP =  (not transport.isPlaying())
-
-                # Handle transport.isPlaying() exception returning 2 when recording countdown is happening
-                if transport.isPlaying() == 2:
-                    nihia.buttons.setLight("STOP", 0)
-                else:
-                    nihia.buttons.setLight("STOP", (not transport.isPlaying()))
-
-            # COUNT-IN button
-            if ui.isPrecountEnabled() != self.COUNT_IN:
-                self.COUNT_IN = ui.isPrecountEnabled()
-                nihia.buttons.setLight("COUNT_IN", ui.isPrecountEnabled())
-            
-            # CLEAR button (moved to OnIdle, since OnRefresh isn't called when focused window changes)
+        self.idleScheduler.run()
 
-            # LOOP button
-            if ui.isLoopRecEnabled() != self.LOOP:
-                self.LOOP = ui.isLoopRecEnabled()
-                nihia.buttons.setLight("LOOP", ui.isLoopRecEnabled())
+        message_queue.flush()
 
-            # METRO button
-            if ui.isMetronomeEnabled() != self.METRO:
-                self.METRO = ui.isMetronomeEnabled()
-                nihia.buttons.setLight("METRO", ui.isMetronomeEnabled())
+    def registerIdlePollers(self):
+        """ Registers the work done on OnIdle on the idle scheduler. """
+        # Applies the knob changes received since the last idle tick
+        self.idleScheduler.register(self.applyMixerChanges, 0)
 
-            # UNDO button
-            if self.getUndoStatus() != self.UNDO:
-                self.UNDO = self.getUndoStatus()
-                nihia.buttons.setLight("UNDO", self.getUndoStatus())
+        # Applies the plugin parameter changes received since the last idle tick
+        self.idleScheduler.register(self.plugin.applyChanges, 0)
 
-            # REDO button
-            if self.getRedoStatus() != self.REDO:
-                self.REDO = self.getRedoStatus()
-                nihia.buttons.setLight("REDO", self.getRedoStatus())
+        # Applies the channel volume and pan changes received since the last idle tick
+        self.idleScheduler.register(self.channelRack.applyChanges, 0)
 
-            # QUANTIZE button is set on init and permanently on
+        # Applies the song position jog steps received since the last idle tick
+        self.idleScheduler.register(self.applyJog, 0)
 
-            # AUTO button is set on init and permanently on
+        # Sends the mixer fields left by the last bank change or full refresh
+        self.idleScheduler.register(self.mixer.repaint, 0)
 
-            # MUTE button
-            if mixer.isTrackMuted(mixer.trackNumber()) != self.MUTE_SELECTED:
-                self.MUTE_SELECTED = mixer.isTrackMuted(mixer.trackNumber())
-                nihia.buttons.setLight("MUTE_SELECTED", mixer.isTrackMuted(mixer.trackNumber()))
-            
-            # SOLO button
-            if mixer.isTrackSolo(mixer.trackNumber()) != self.SOLO_SELECTED:
-                self.SOLO_SELECTED = mixer.isTrackSolo(mixer.trackNumber())
-                nihia.buttons.setLight("SOLO_SELECTED", mixer.isTrackSolo(mixer.trackNumber()))
-
-        # Undocumented flag for recording state changes
-        elif flag == 260:
-            # REC button
-            if transport.isRecording() != self.REC:
-                self.REC = transport.isRecording()
-                nihia.buttons.setLight("REC", transport.isRecording())
+        # Reads the groups of tracks next to the one being shown into the mixer copy
+        self.idleScheduler.register(self.mixer.prefetch, 0)
+
+        # OnRefresh isn't called when the focused window changes, so the CLEAR button LED gets polled
+        self.idleScheduler.register(self.updateClearLight, config.FOCUS_POLL_INTERVAL)
+
+        # Neither when a plugin window or the channel rack get focused, which switches the mode of the track slots
+        self.idleScheduler.register(self.updateMode, config.FOCUS_POLL_INTERVAL)
+
+        # Loading a Komplete Kontrol instance on the selected channel doesn't call OnRefresh either
+        self.idleScheduler.register(self.mixer.updateKompleteInstance, config.KOMPLETE_POLL_INTERVAL)
 
+    def updateClearLight(self):
+        """ Updates the LED of the CLEAR button, which is on while the piano roll is focused. """
+        self.lights.state[led_definition.CLEAR] = host_snapshot.get(ui.getFocused, midi.widPianoRoll)
+        self.lights.send()
+
+    def updateMode(self):
+        """ Switches the track slots of the device between the mixer, the plugin control mode (on while a plugin window
+        is focused) and the channel rack mode (on while the channel rack is focused), if enabled on the config file.
+        """
+        target = plugin_definition.focusedPlugin() if config.PLUGIN_CONTROL == 1 else None
+
+        if target is not None:
+            view = self.plugin
+            self.plugin.setTarget(target)
+        elif config.CHANNEL_RACK_CONTROL == 1 and host_snapshot.get(ui.getFocused, midi.widChannelRack) == True:
+            view = self.channelRack
         else:
-            self.mixer.update()
+            view = self.mixer
 
-    def OnDirtyMixerTrack(self, index):
-        if index == -1:
-            self.mixer.need_full_refresh = True
+        if view.visible:
+            return
+
+        # The mixer gets hidden before another mode is shown and shown after the other mode is hidden
+        for other in (self.plugin, self.channelRack, self.mixer):
+            if other.visible:
+                other.hide()
+
+        view.show()
+
+    def OnRefresh(self, flag):
+        host_snapshot.reset()
+
+        # FL Studio reports several changes at once by combining HW_Dirty flags, so every part of the script whose
+        # bits are set on the flag gets updated and the rest are skipped
+        for mask, route in self.refreshRoutes:
+            if flag & mask:
+                route(flag)
 
-        # Queue an update for a specific track
-        elif self.mixer.trackFirst <= index < self.mixer.trackFirst + self.mixer.trackLimit:
-            self.mixer.need_refresh += [index - self.mixer.trackFirst]
+        self.lights.send()
+        message_queue.flush()
+
+    def registerRefreshRoutes(self):
+        """ Registers the parts of the script OnRefresh updates for each HW_Dirty flag. """
+        # Transport and edit lights
+        self.refreshRoutes.append((midi.HW_Dirty_LEDs, self.updateLights))
+
+        # Mute and solo lights of the selected track, which change along with the mixer
+        self.refreshRoutes.append((midi.HW_Dirty_LEDs | midi.HW_Dirty_Mixer_Sel | midi.HW_Dirty_Mixer_Controls,
+                                   self.updateSelectedTrackLights))
+
+        # Komplete Kontrol instance, checked again on the next idle poll if the plugin of a channel may have changed
+        self.refreshRoutes.append((mixer_definition.PLUGIN_FLAGS, self.mixer.invalidateKompleteInstance))
+
+        # Plugin parameters, forgetting what may have changed and updating the page being shown in plugin control mode
+        self.refreshRoutes.append((plugin_definition.PLUGIN_FLAGS, self.plugin.invalidate))
+
+        # Channels, read again the next time they are shown and updated on the device in channel rack mode
+        self.refreshRoutes.append((channel_definition.CHANNEL_FLAGS, self.channelRack.invalidate))
+
+        # Mixer tracks, only on the fields the flag reports
+        self.refreshRoutes.append((mixer_definition.REFRESH_FLAGS,
+                                   lambda flag: self.mixer.update(mixer_definition.refreshFields(flag))))
+
+    def updateLights(self, flag: int):
+        """ Reads the state of the lights FL Studio reports with HW_Dirty_LEDs. """
+        state = self.lights.state
+
+        # PLAY and STOP buttons
+        # transport.isPlaying() returns 2 when recording countdown is happening, which turns off both lights
+        isPlaying = host_snapshot.get(transport.isPlaying)
+        state[led_definition.PLAY] = int(isPlaying == 1)
+        state[led_definition.STOP] = int(not isPlaying)
+
+        # REC button
+        # Recording state changes come with HW_Dirty_LEDs and HW_Dirty_Mixer_Controls set (flag 260)
+        state[led_definition.REC] = host_snapshot.get(transport.isRecording)
+
+        # COUNT-IN, LOOP and METRO buttons
+        state[led_definition.COUNT_IN] = host_snapshot.get(ui.isPrecountEnabled)
+        state[led_definition.LOOP] = host_snapshot.get(ui.isLoopRecEnabled)
+        state[led_definition.METRO] = host_snapshot.get(ui.isMetronomeEnabled)
+
+        # CLEAR button is polled on OnIdle, since OnRefresh isn't called when focused window changes
+
+        # UNDO and REDO buttons
+        state[led_definition.UNDO] = self.getUndoStatus()
+        state[led_definition.REDO] = self.getRedoStatus()
+
+        # QUANTIZE, AUTO and TEMPO buttons are set on init and permanently on
+
+    def updateSelectedTrackLights(self, flag: int):
+        """ Reads the state of the MUTE and SOLO button lights, which show the state of the selected mixer track. """
+        state = self.lights.state
+
+        selectedTrack = host_snapshot.get(mixer.trackNumber)
+        state[led_definition.MUTE_SELECTED] = host_snapshot.get(mixer.isTrackMuted, selectedTrack)
+        state[led_definition.SOLO_SELECTED] = host_snapshot.get(mixer.isTrackSolo, selectedTrack)
+
+    def OnDirtyMixerTrack(self, index):
+        # Queue an update for a specific track, or for all of them if index is -1
+        self.mixer.markDirty(index)
 
     def OnUpdateMeters(self):           # Intended to be declared by child
         raise NotImplementedError()
@@ -440,6 +687,13 @@ class Core:
         # Convert the speed value received by the knob to be a normalized sensitivity multiplier
         return abs(-1 / (speed - 64))
 
+    def knobStep(self, dataType: str, sensitivity: float) -> float:
+        """ Returns how much a knob message changes the volume (VOLUME) or pan (PAN) of a mixer track or a channel. """
+        if dataType == "VOLUME":
+            return config.KNOB_INCREMENTS_VOL * sensitivity
+
+        return config.KNOB_INCREMENTS_PAN * sensitivity
+
     def adjustMixer(self, knob: int, dataType: str, action: str, selectedTrack: int, sensitivity: float):
         """ Dynamically maps the physical knob to the right mixer track depending on the track group the selected track belongs to, and adjusts the parameter.
         ### Parameters
@@ -454,29 +708,69 @@ class Core:
 
         - sensitivity: From 0 (minimum) to 1 (maximum). The greater the sensitivity, the greater will be the modification of the desired parameter.
         """
-        # Calculates which track group the current track belongs to and truncates the value to get the exact number
-        trackGroup = math.trunc(1/8 * selectedTrack)
+        # Finds the group the selected track belongs to and its first track
+        banks = self.mixer.banks
+        trackGroup = banks.bankOf[selectedTrack]
+        trackFirst = banks.first[trackGroup]
 
-        # Multiplies the trackGroup to 8 to get the index of the first track of that group
-        trackFirst = trackGroup * 8
-
-        if (trackGroup == 15) and (knob == 6 or knob == 7): # Control 15th group exception
+        if knob >= banks.size[trackGroup]:  # Knobs past the last track of a smaller group
             return
 
         else:
+            # The change is accumulated and gets applied on the next idle tick, so a fast knob turn results in a single
+            # write to the mixer instead of one per message
+            self.queueMixerChange(trackFirst + knob, dataType, self.knobStep(dataType, sensitivity),
+                                  -1 if action == "DECREASE" else 1)
+
+    def queueMixerChange(self, track: int, dataType: str, step: float, count: int):
+        """ Schedules a volume or pan change of a mixer track, applied on the next call to `applyMixerChanges()`.
+        ### Parameters
+
+        - track: The mixer track.
+
+        - dataType: PAN or VOLUME.
+
+        - step: Size of each step, always positive.
+
+        - count: Amount of steps, negative to decrease.
+        """
+        mixer_definition.queueSteps(self.mixerChanges.setdefault((track, dataType), []), step, count)
+
+    def applyMixerChanges(self):
+        """ Applies the volume and pan changes accumulated by `queueMixerChange` since the last call, writing each
+        parameter of each track only once.
+
+        The result is the same as applying every step on its own (see `mixer_definition.applySteps()`), and changes
+        that leave the parameter unchanged don't write anything.
+        """
+        if not self.mixerChanges:
+            return
+
+        written = False
+
+        for (track, dataType), runs in self.mixerChanges.items():
+            if dataType == "VOLUME":
+                value = host_snapshot.get(mixer.getTrackVolume, track)
+            else:
+                value = host_snapshot.get(mixer.getTrackPan, track)
+
+            value = mixer_definition.applySteps(value, runs, *MIXER_RANGES[dataType])
+
+            if value is None:
+                continue
+
             if dataType == "VOLUME":
-                if action == "INCREASE":
-                    mixer.setTrackVolume(trackFirst + knob, mixer.getTrackVolume(trackFirst + knob) + (config.KNOB_INCREMENTS_VOL * sensitivity))
-                
-                elif action == "DECREASE":
-                    mixer.setTrackVolume(trackFirst + knob, mixer.getTrackVolume(trackFirst + knob) - (config.KNOB_INCREMENTS_VOL * sensitivity))
+                mixer.setTrackVolume(track, value)
+            else:
+                mixer.setTrackPan(track, value)
 
-            elif dataType == "PAN":
-                if action == "INCREASE":
-                    mixer.setTrackPan(trackFirst + knob, mixer.getTrackPan(trackFirst + knob) + (config.KNOB_INCREMENTS_PAN * sensitivity))
+            written = True
 
-                elif action == "DECREASE":
-                    mixer.setTrackPan(trackFirst + knob, mixer.getTrackPan(trackFirst + knob) - (config.KNOB_INCREMENTS_PAN * sensitivity))
+        self.mixerChanges.clear()
+
+        # Values read before the changes aren't valid anymore
+        if written:
+            host_snapshot.reset()
 
     def getUndoStatus(self):
         """ Helper function to set the light on the UNDO button. """
@@ -524,140 +818,52 @@ class Core:
 
 class A_Series(Core):
     """ Controller code specific to A/M-Series keyboards. """
-    def OnMidiMsgAdd(self, event):
-        # Mute button - A-Series
-        if event.data1 == nihia.buttons.button_list.get("MUTE_SELECTED"):
-            event.handled = True
-            mixer.muteTrack(mixer.trackNumber())
+    HAS_METERS = False
+    HAS_TRACK_SELECT = False
+    HAS_MULTI_MUTE = False
 
-        # Solo button - A-Series
-        elif event.data1 == nihia.buttons.button_list.get("SOLO_SELECTED"):
-            event.handled = True
-            mixer.soloTrack(mixer.trackNumber())
-        
+    def registerMidiHandlersAdd(self):
         # 4D Encoder up
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_Y_A") and event.data2 == nihia.buttons.button_list.get("UP"):
-            event.handled = True
-            ui.up()
+        self.registerMidiHandler("ENCODER_Y_A", lambda event: ui.up(), "UP")
 
-        # 4D Encoder down 
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_Y_A") and event.data2 == nihia.buttons.button_list.get("DOWN"):
-            event.handled = True
-            ui.down()
+        # 4D Encoder down
+        self.registerMidiHandler("ENCODER_Y_A", lambda event: ui.down(), "DOWN")
 
-        # 4D Encoder (using FPT because ui.left doesn't work on the playlist)
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_X_A") and event.data2 == nihia.buttons.button_list.get("LEFT"):
-            event.handled = True
-            if ui.getFocused(midi.widMixer) == True:
-                # This one doesn't move the mixer view as you get to the border
-                # ----------------------------------------------------
-                # mixer.setTrackNumber(mixer.trackNumber() - 1)
-                # ----------------------------------------------------
-                ui.left()
-
-            else:
-                ui.left()
-
-        # 4D Encoder (using FPT because ui.right doesn't work on the playlist)
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_X_A") and event.data2 == nihia.buttons.button_list.get("RIGHT"):
-            event.handled = True
-            if ui.getFocused(midi.widMixer) == True:
-                # This one doesn't move the mixer view as you get to the border
-                # ----------------------------------------------------
-                # mixer.setTrackNumber(mixer.trackNumber() + 1)
-                # ----------------------------------------------------
-                ui.right()
-            
-            else:
-                ui.right()
+        # 4D Encoder left and right
+        self.registerMidiHandler("ENCODER_X_A", lambda event: self.encoderX(-1), "LEFT")
+        self.registerMidiHandler("ENCODER_X_A", lambda event: self.encoderX(1), "RIGHT")
 
 class S_SeriesMK2(Core):
     """ Controller code specific to S-Series MK2 keyboards. """
-    def OnInitAdd(self):
-        # Tells to FL Studio the device has peak meters
-        device.setHasMeters()
+    HAS_METERS = True
+    HAS_TRACK_SELECT = True
+    HAS_MULTI_MUTE = True
 
+    def OnInitAdd(self):
         # Sets the lights of the 4D Encoder on S-Series keyboards on
         nihia.buttons.setLight("ENCODER_X_S", 1)
         nihia.buttons.setLight("ENCODER_X_S", 127)
         nihia.buttons.setLight("ENCODER_Y_S", 1)
         nihia.buttons.setLight("ENCODER_Y_S", 127)
 
-    def OnMidiMsgAdd(self, event):
-        # Mute button - S-Series
-        if event.data1 == nihia.buttons.button_list.get("MUTE"):
-            event.handled = True
-            self.mixerCommandHandler("MUTE", event.data2, mixer.trackNumber())
-
-        # Solo button - S-Series
-        elif event.data1 == nihia.buttons.button_list.get("SOLO"):
-            event.handled = True
-            self.mixerCommandHandler("SOLO", event.data2, mixer.trackNumber())
-
-        # Track selection (top white buttons) - S-Series
-        elif event.data1 == nihia.buttons.button_list.get("TRACK_SELECT"):
-            event.handled = True
-            self.mixerCommandHandler("TRACK_SELECTION", event.data2, mixer.trackNumber())
-        
+    def registerMidiHandlersAdd(self):
         # 4D Encoder up
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_Y_S") and event.data2 == nihia.buttons.button_list.get("UP"):
-            event.handled = True
-            ui.up()
-
-        # 4D Encoder down 
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_Y_S") and event.data2 == nihia.buttons.button_list.get("DOWN"):
-            event.handled = True
-            ui.down()
+        self.registerMidiHandler("ENCODER_Y_S", lambda event: ui.up(), "UP")
 
-        # 4D Encoder (using FPT because ui.left doesn't work on the playlist)
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_X_S") and event.data2 == nihia.buttons.button_list.get("LEFT"):
-            event.handled = True
-            if ui.getFocused(midi.widMixer) == True:
-                # This one doesn't move the mixer view as you get to the border
-                # ----------------------------------------------------
-                # mixer.setTrackNumber(mixer.trackNumber() - 1)
-                # ----------------------------------------------------
-                ui.left()
-
-            else:
-                ui.left()
+        # 4D Encoder down
+        self.registerMidiHandler("ENCODER_Y_S", lambda event: ui.down(), "DOWN")
 
-        # 4D Encoder (using FPT because ui.right doesn't work on the playlist)
-        elif event.data1 == nihia.buttons.button_list.get("ENCODER_X_S") and event.data2 == nihia.buttons.button_list.get("RIGHT"):
-            event.handled = True
-            if ui.getFocused(midi.widMixer) == True:
-                # This one doesn't move the mixer view as you get to the border
-                # ----------------------------------------------------
-                # mixer.setTrackNumber(mixer.trackNumber() + 1)
-                # ----------------------------------------------------
-                ui.right()
-            
-            else:
-                ui.right()
+        # 4D Encoder left and right
+        self.registerMidiHandler("ENCODER_X_S", lambda event: self.encoderX(-1), "LEFT")
+        self.registerMidiHandler("ENCODER_X_S", lambda event: self.encoderX(1), "RIGHT")
 
     def OnUpdateMeters(self):
-        self.mixer.sendPeakInfo()
-
-    def mixerCommandHandler(self, action: str, targetTrack: int, selectedTrack: int):
-        """ Handles the way mute, solo and track selection commands are sent from S-Series keyboards. 
-        ### Parameters
-        
-        - action: MUTE, SOLO or TRACK_SELECTION.
-        - targetTrack: From 0 to 7, the track that the user is trying to mute or solo from the ones showing on the device's mixer.
-        - selectedTrack: The currently selected track that is used to calculate the track group.
-        """
-        # Uses the function to know which track group the current track belongs to and truncates the value to get the exact number
-        trackGroup = math.trunc(1/8 * selectedTrack)
-
-        # Multiplies the trackGroup to 8 to get the index of the first track that has to be shown
-        trackFirst = trackGroup * 8
+        host_snapshot.reset()
 
-        # Adjusts the correct property of the right track
-        if action == "MUTE":
-            mixer.muteTrack(trackFirst + targetTrack)
-
-        elif action == "SOLO":
-            mixer.soloTrack(trackFirst + targetTrack)
+        self.mixer.sendPeakInfo()
 
-        elif action == "TRACK_SELECTION":
-            mixer.selectTrack(trackFirst + targetTrack)
+# Controller class of every device ID returned by `midi_setup_check.settingsCheck()`
+controllers = {
+    0: S_SeriesMK2,
+    1: A_Series,
+}
@@ -32,41 +32,70 @@ import utils
 import nihia
 from nihia import *
 
+# Imported after nihia, which also has a mixer module
+import mixer
+
 import midi_setup_check
 import controller_definition
+import config
 
 ######################################################################################################################
 # Script logic
 ######################################################################################################################
 
-if midi_setup_check.settingsCheck() == 0:
-    print("Detected device: ", midi_setup_check.supportedDevices.get(device.getName())[1])
-    keyboard = controller_definition.S_SeriesMK2()
-
-elif midi_setup_check.settingsCheck() == 1:
-    print("Detected device: ", midi_setup_check.supportedDevices.get(device.getName())[1])
-    keyboard = controller_definition.A_Series()
+# Detects the device once and creates the controller for it
+deviceID = midi_setup_check.settingsCheck()
+print("Detected device: ", midi_setup_check.supportedDevices.get(device.getName())[1])
+keyboard = controller_definition.controllers[deviceID]()
 
-def OnInit():
-    keyboard.OnInit()
+# Callbacks are bound straight to the methods of the controller, so FL Studio calls them without going through
+# another function
+OnInit = keyboard.OnInit
+OnMidiMsg = keyboard.OnMidiMsg
+OnIdle = keyboard.OnIdle
+OnRefresh = keyboard.OnRefresh
+OnDirtyMixerTrack = keyboard.OnDirtyMixerTrack
 
 def OnDeInit():
     keyboard.OnDeInit()
 
-def OnMidiMsg(event):
-    keyboard.OnMidiMsg(event)
-
-def OnIdle():
-    keyboard.OnIdle()
-
-def OnRefresh(flag):
-    keyboard.OnRefresh(flag)
-
-def OnDirtyMixerTrack(index):
-    keyboard.OnDirtyMixerTrack(index)
-
-def OnUpdateMeters():
-    # Fix OnUpdateMeters getting called regardless of device.setHasMeters() being called
-    # by the script in FL Studio 20.9
-    if type(keyboard) == type(controller_definition.S_SeriesMK2()):
-        keyboard.OnUpdateMeters()
+    if config.PROFILER == 1:
+        profiler.dump(config.PROFILER_OUTPUT)
+
+    if config.RECORDER == 1:
+        recorder.dump(config.RECORDER_OUTPUT)
+
+# FL Studio 20.9 calls OnUpdateMeters regardless of device.setHasMeters() being called by the script, so devices
+# without peak meters get a function that does nothing
+if keyboard.HAS_METERS:
+    OnUpdateMeters = keyboard.OnUpdateMeters
+else:
+    def OnUpdateMeters():
+        pass
+
+# Records the callbacks if the recorder is enabled on the config file
+# The recorder and the profiler are only imported when enabled, so the modules they need are never loaded otherwise
+if config.RECORDER == 1:
+    import recorder
+
+    recorder.start(config.RECORDER_SIZE, device.getName(), mixer.trackCount())
+
+    OnInit = recorder.wrap("OnInit", OnInit)
+    OnDeInit = recorder.wrap("OnDeInit", OnDeInit)
+    OnMidiMsg = recorder.wrap("OnMidiMsg", OnMidiMsg)
+    OnIdle = recorder.wrap("OnIdle", OnIdle)
+    OnRefresh = recorder.wrap("OnRefresh", OnRefresh)
+    OnDirtyMixerTrack = recorder.wrap("OnDirtyMixerTrack", OnDirtyMixerTrack)
+    OnUpdateMeters = recorder.wrap("OnUpdateMeters", OnUpdateMeters)
+
+# Instruments the callbacks and the MIDI handlers if the profiler is enabled on the config file
+if config.PROFILER == 1:
+    import profiler
+
+    OnMidiMsg = profiler.wrap("OnMidiMsg", OnMidiMsg)
+    OnIdle = profiler.wrap("OnIdle", OnIdle)
+    OnRefresh = profiler.wrap("OnRefresh", OnRefresh)
+    OnDirtyMixerTrack = profiler.wrap("OnDirtyMixerTrack", OnDirtyMixerTrack)
+    OnUpdateMeters = profiler.wrap("OnUpdateMeters", OnUpdateMeters)
+
+    profiler.wrapHandlers(keyboard.midiHandlers)
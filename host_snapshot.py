@@ -0,0 +1,55 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Snapshot of the FL Studio state read during a single callback.
+
+Host getters are read through `get()`, which only calls FL Studio the first time a value is requested. Every callback
+has to call `reset()` before reading anything, so values never outlive the callback they were read on.
+"""
+
+# Values read during the current callback, keyed by (getter, arguments)
+values = {}
+
+def reset():
+    """ Forgets every value read so far. Has to be called at the start of every callback and after writing to the host
+    something that is going to be read again during the same callback.
+    """
+    values.clear()
+
+def get(getter, *args):
+    """ Returns the result of calling an FL Studio API getter, calling it only if it hasn't been called with the same
+    arguments since the last `reset()`.
+
+    ### Parameters
+
+    - getter: The FL Studio API function to read from (for example `mixer.getTrackVolume`).
+
+    - args: Arguments to call the getter with.
+    """
+    key = (getter, args)
+
+    try:
+        return values[key]
+    except KeyError:
+        value = values[key] = getter(*args)
+        return value
@@ -0,0 +1,104 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Scheduler for the work done on OnIdle.
+
+FL Studio calls OnIdle many times per second, but most of the state checked there changes much less often. Every task
+is registered as a poller with its own interval. Pollers with an interval are kept sorted by the time of their next run,
+so `run()` stops at the first one that isn't due yet and the cost of an idle tick only grows with the amount of pollers
+that are due.
+"""
+
+import time
+
+class Scheduler:
+    def __init__(self):
+        # Pollers called on every run, in the order they were registered
+        self.everyRun = []
+
+        # Pollers with an interval, as [time of the next run, function, interval], sorted by the time of the next run
+        self.pollers = []
+
+    def register(self, function, interval: float):
+        """ Registers a function to be called by `run()`. Pollers with an interval of 0 get called before the rest.
+
+        ### Parameters
+
+        - function: The function to call. It takes no arguments.
+
+        - interval: Minimum time in seconds between two calls. With 0, the function gets called on every `run()`.
+        """
+        if interval <= 0:
+            self.everyRun.append(function)
+        else:
+            self.insert([0.0, function, interval])
+
+    def insert(self, poller: list):
+        """ Inserts a poller after every poller due at the same time or earlier. """
+        pollers = self.pollers
+        low = 0
+        high = len(pollers)
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if pollers[middle][0] <= poller[0]:
+                low = middle + 1
+            else:
+                high = middle
+
+        pollers.insert(low, poller)
+
+    def run(self, force: bool = False):
+        """ Calls every poller whose interval has elapsed since its last call.
+
+        ### Parameters
+
+        - force: Call every poller, no matter when it was last called.
+        """
+        for function in self.everyRun:
+            function()
+
+        pollers = self.pollers
+        if not pollers:
+            return
+
+        now = time.perf_counter()
+
+        if force:
+            due = len(pollers)
+        elif pollers[0][0] > now:
+            return
+        else:
+            due = 1
+            while due < len(pollers) and pollers[due][0] <= now:
+                due += 1
+
+        # Due pollers get called in the order of their scheduled time, and scheduled again from now
+        running = pollers[:due]
+        del pollers[:due]
+
+        for poller in running:
+            poller[0] = now + poller[2]
+            self.insert(poller)
+            poller[1]()
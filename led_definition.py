@@ -0,0 +1,91 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+State of the button lights of the device.
+
+The state of every light is stored on a list indexed by the constants below. Callbacks write the state they read from
+FL Studio on `Lights.state` and call `Lights.send()`, which only sends the lights that changed since the last time they
+were sent.
+"""
+
+import nihia.buttons
+
+# Buttons with a light, in the order their states are stored
+LIGHTS = (
+    "PLAY",
+    "STOP",
+    "REC",
+    "COUNT_IN",
+    "CLEAR",
+    "LOOP",
+    "METRO",
+    "TEMPO",
+    "UNDO",
+    "REDO",
+    "QUANTIZE",
+    "AUTO",
+    "MUTE_SELECTED",
+    "SOLO_SELECTED",
+)
+
+# Index of every light on the state lists
+PLAY            = 0
+STOP            = 1
+REC             = 2
+COUNT_IN        = 3
+CLEAR           = 4
+LOOP            = 5
+METRO           = 6
+TEMPO           = 7
+UNDO            = 8
+REDO            = 9
+QUANTIZE        = 10
+AUTO            = 11
+MUTE_SELECTED   = 12
+SOLO_SELECTED   = 13
+
+class Lights:
+    def __init__(self):
+        # States the lights have to show, None for lights the script doesn't know the state of yet
+        self.state = [None] * len(LIGHTS)
+
+        # States last sent to the device, None for lights that haven't been sent yet
+        self.sent = [None] * len(LIGHTS)
+
+    def send(self):
+        """ Sends to the device the lights whose state changed since they were last sent. """
+        state = self.state
+        sent = self.sent
+
+        for x in range(len(LIGHTS)):
+            value = state[x]
+            if value is not None and value != sent[x]:
+                sent[x] = value
+                nihia.buttons.setLight(LIGHTS[x], value)
+
+    def forget(self):
+        """ Forgets the states sent so far, so every light gets sent again on the next `send()`. Has to be called when
+        the device loses its lights, like after the handshake.
+        """
+        for x in range(len(LIGHTS)):
+            self.sent[x] = None
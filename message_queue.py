@@ -0,0 +1,64 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Outbound queue for the messages that update the display of the device.
+
+Display fields are written with `queue()` instead of calling nihia directly. Writes to the same field collapse into
+the latest one and `flush()`, called once at the end of every callback, only sends the fields whose value differs from
+the one the device is already showing.
+"""
+
+# Marker for fields that haven't been sent to the device yet
+UNSENT = object()
+
+# Values waiting to be sent, keyed by (sender, arguments that identify the field)
+pending = {}
+
+# Last value sent to the device for every field
+sent = {}
+
+def queue(sender, *args):
+    """ Schedules a display field update to be sent on the next `flush()`.
+
+    ### Parameters
+
+    - sender: The nihia function that sends the update (for example `nihia.mixer.setTrackName`).
+
+    - args: Arguments to call the sender with. The last one is the value of the field and the rest identify the field.
+    """
+    pending[(sender,) + args[:-1]] = args[-1]
+
+def flush():
+    """ Sends the pending updates whose value differs from the one last sent for the same field. """
+    for key, value in pending.items():
+        if sent.get(key, UNSENT) != value:
+            key[0](*key[1:], value)
+            sent[key] = value
+
+    pending.clear()
+
+def forget():
+    """ Forgets what the device is showing, so every field gets sent again on its next update. Has to be called every
+    time the display of the device is reset (for example, after the handshake).
+    """
+    sent.clear()
@@ -27,270 +27,693 @@ import channels
 import math
 import midi
 import ui
+import transport
+import time
+from array import array
 
 import config
+import host_snapshot
+import message_queue
 import nihia.mixer
 
-class Track:
-    def __init__(self, id: int):
-        # Physical ID of the track, from 0 to 7
-        self.id = id
+# Peak meter range conversion
+# FL Studio reports peaks from 0 to 1.1 (values beyond that are clipping) and the device expects them from 0 to 127
+PEAK_MAX = 1.1
+PEAK_SCALE = 127 / PEAK_MAX
+PEAK_CLIP = int(PEAK_MAX * PEAK_SCALE)
+
+# FL Studio stores mixer volumes with a resolution of 1/12800, so every volume a mixer track can have gets its own
+# entry on the volume string table
+VOL_STEPS = 12800
+
+# Display strings for every volume step, filled the first time each step is shown
+volStrings = [None] * (VOL_STEPS + 1)
+
+# Display strings for every pan percentage
+PAN_STRINGS_LEFT = tuple(str(x) + "% Left" for x in range(101))
+PAN_STRINGS_RIGHT = tuple(str(x) + "% Right" for x in range(101))
+
+# Peak channels in the order the device expects them for each track
+PEAK_CHANNELS = (midi.PEAK_L, midi.PEAK_R)
+
+# Minimum time in seconds between two peak meter updates while FL Studio is playing and while it is stopped
+PEAK_INTERVAL = 1 / config.PEAK_METER_RATE if config.PEAK_METER_RATE > 0 else 0
+PEAK_INTERVAL_STOPPED = 1 / config.PEAK_METER_RATE_STOPPED if config.PEAK_METER_RATE_STOPPED > 0 else 0
+
+# Amount of tracks the device shows at once
+TRACK_SLOTS = 8
+
+# Track fields, as bits of the dirty field masks
+FIELD_NAME = 1
+FIELD_VOL = 2
+FIELD_PAN = 4
+FIELD_ARM = 8
+FIELD_SEL = 16
+FIELD_SOLO = 32
+FIELD_MUTE = 64
+FIELD_ALL = 127
+
+# Track fields sent at once when the whole mixer is repainted, since they tell which tracks are being shown
+REPAINT_CRITICAL = FIELD_NAME | FIELD_SEL
+
+# Order in which the rest of the fields get sent during a repaint
+REPAINT_ORDER = (FIELD_NAME, FIELD_SEL, FIELD_VOL, FIELD_MUTE, FIELD_SOLO, FIELD_PAN, FIELD_ARM)
+
+# Track fields that may have changed for each OnRefresh flag
+REFRESH_FIELDS = (
+    (midi.HW_Dirty_Mixer_Sel, FIELD_SEL),
+    (midi.HW_Dirty_Mixer_Display, FIELD_NAME | FIELD_ARM),
+    (midi.HW_Dirty_Mixer_Controls, FIELD_VOL | FIELD_PAN | FIELD_ARM | FIELD_SOLO | FIELD_MUTE),
+    (midi.HW_Dirty_Names, FIELD_NAME),
+)
+
+# OnRefresh flags that may report a change of the plugin loaded on a channel
+PLUGIN_FLAGS = midi.HW_ChannelEvent | midi.HW_Dirty_Names | midi.HW_Dirty_RemoteLinks
+
+# OnRefresh flags that report changes on the mixer, every one of them on REFRESH_FIELDS
+REFRESH_FLAGS = (midi.HW_Dirty_Mixer_Sel | midi.HW_Dirty_Mixer_Display | midi.HW_Dirty_Mixer_Controls |
+                 midi.HW_Dirty_Names)
+
+# Values stored for fields that are unknown, which never match a value read from FL Studio
+NAN = float("nan")
+UNKNOWN = -1
+
+# Index stored for track slots that have been cleared on the device by `clearSlot()`
+CLEARED = -2
+
+# FL Studio getter of every track field
+FIELD_GETTERS = {
+    FIELD_NAME: mixer.getTrackName,
+    FIELD_VOL: mixer.getTrackVolume,
+    FIELD_PAN: mixer.getTrackPan,
+    FIELD_ARM: mixer.isTrackArmed,
+    FIELD_SEL: mixer.isTrackSelected,
+    FIELD_SOLO: mixer.isTrackSolo,
+    FIELD_MUTE: mixer.isTrackMuted,
+}
+
+class MixerShadow:
+    """ Copy of the fields of every track on the FL Studio mixer, not only the ones being shown on the device.
+
+    Fields are stored on a list (names) or a typed array (the rest) per field indexed by track number and only read
+    from FL Studio when they are stale, which happens when OnDirtyMixerTrack reports the track. Switching to another
+    group of tracks paints from the copy and only reads what changed since the tracks were last read.
+
+    Other lists of FL Studio can be copied the same way by passing their own getters, as {FIELD_*: getter(index)}.
+    """
+    def __init__(self, getters: dict = FIELD_GETTERS):
+        # FL Studio getter of every field
+        self.getters = getters
+
+        # Amount of tracks on the FL Studio mixer, 0 until `resize()` is called
+        self.trackCount = 0
+
+        # Values of every field, as {FIELD_*: [value of track 0, value of track 1 ...]}
+        # Names are stored on a list, volumes and pans on arrays of doubles and the rest on arrays of bytes
+        self.values = {field: [] for field in getters}
+
+        # Fields of every track that have to be read again from FL Studio, as bitmasks of FIELD_* values
+        self.stale = []
+
+    def resize(self, trackCount: int):
+        """ Makes room for the given amount of tracks and marks every field of every track as stale. """
+        self.trackCount = trackCount
+
+        for field in self.values:
+            if field == FIELD_NAME:
+                self.values[field] = [None] * trackCount
+            elif field == FIELD_VOL or field == FIELD_PAN:
+                self.values[field] = array("d", [NAN]) * trackCount
+            else:
+                self.values[field] = array("b", [UNKNOWN]) * trackCount
+
+        self.stale = array("H", [FIELD_ALL]) * trackCount
+
+    def markStale(self, index: int, fields: int = FIELD_ALL):
+        """ Marks the given fields of a track to be read again from FL Studio the next time they are requested. """
+        if 0 <= index < self.trackCount:
+            self.stale[index] |= fields
+
+    def markAllStale(self, fields: int = FIELD_ALL):
+        """ Marks the given fields of every track to be read again from FL Studio the next time they are requested. """
+        for x in range(self.trackCount):
+            self.stale[x] |= fields
+
+    def get(self, field: int, index: int):
+        """ Returns a field of a track, reading it from FL Studio only if it's stale.
+        ### Arguments
+         - field (int): One of the FIELD_* values.
+         - index (int): The mixer track.
+        """
+        values = self.values[field]
+
+        if self.stale[index] & field:
+            values[index] = host_snapshot.get(self.getters[field], index)
+            self.stale[index] &= ~field
+
+        return values[index]
+
+class BankMap:
+    """ Index of the groups (banks) of mixer tracks the device shows.
+
+    Built once from the amount of tracks on the FL Studio mixer and the bank size and offset set on the config file, so
+    finding the bank and slot of a track or the tracks of a bank is a list lookup. The last bank gets the tracks left,
+    which may be less than the bank size.
+    """
+    def __init__(self):
+        # Amount of tracks on the FL Studio mixer
+        self.trackCount = 0
+
+        # First track and amount of tracks of every bank
+        self.first = []
+        self.size = []
+
+        # Bank every mixer track belongs to and slot of the device it's shown on (-1 for tracks that aren't shown)
+        self.bankOf = []
+        self.slotOf = []
+
+    def build(self, trackCount: int, size: int, offset: int, shown: int = None):
+        """ Builds the index.
+        ### Arguments
+         - trackCount (int): Amount of tracks on the FL Studio mixer, as returned by `mixer.trackCount()`.
+         - size (int): Amount of tracks of each bank, from 1 to TRACK_SLOTS.
+         - offset (int): First mixer track of the first bank.
+         - shown (int): Amount of tracks that can be shown on a bank, counting from the first one. By default, every
+         track but the last one, which is the "current" track of the mixer.
+        """
+        if shown is None:
+            shown = trackCount - 1
+
+        last = max(shown - 1, 0)
+        size = min(max(size, 1), TRACK_SLOTS)
+        offset = min(max(offset, 0), last)
+
+        self.trackCount = trackCount
+        self.first = list(range(offset, last + 1, size))
+        self.size = [min(size, last + 1 - first) for first in self.first]
+
+        # Tracks before the offset and the "current" track belong to the nearest bank without being shown on it
+        self.bankOf = [min(max(track - offset, 0) // size, len(self.first) - 1) for track in range(trackCount)]
+        self.slotOf = [(track - offset) % size if offset <= track <= last else -1 for track in range(trackCount)]
+
+class TrackStates:
+    """ What the device shows on every track slot, stored as an array per field across all the slots.
+
+    Unknown values are stored as NaN for volumes and pans, UNKNOWN for the rest of numbers and None for names, so they
+    never match a value read from FL Studio and always get sent. Resetting slots is a slice assignment per field.
+    """
+    def __init__(self, slots: int):
+        self.slots = slots
 
         # Equivalent of track index for the represented mixer track
-        self.index = None
+        self.index = array("i", [UNKNOWN]) * slots
 
         # Existence and/or track type of the track
-        self.exist = False
+        self.exist = array("b", [0]) * slots
 
         # String to be displayed as the name of the track
-        self.name = None
-        
-        # Number to be displayed as the volume of the track
-        self.vol = None
+        self.name = [None] * slots
 
-        # Number to be displayed as the panning of the track
-        self.pan = None
+        # Number to be displayed as the volume and the panning of the track
+        self.vol = array("d", [NAN]) * slots
+        self.pan = array("d", [NAN]) * slots
 
-        # Armed for recording state
-        self.armed = None
+        # Armed for recording, selection, solo and mute states
+        self.armed = array("b", [UNKNOWN]) * slots
+        self.selected = array("b", [UNKNOWN]) * slots
+        self.solo = array("b", [UNKNOWN]) * slots
+        self.muted = array("b", [UNKNOWN]) * slots
 
-        # Selection state
-        self.selected = None
+    def reset(self, first: int = 0, last: int = None):
+        """ Forgets the state of the slots from `first` to `last` (both included), or of every slot if no range is
+        given.
+        """
+        if last is None:
+            last = self.slots - 1
+
+        count = last - first + 1
+        if count <= 0:
+            return
+
+        end = last + 1
+        self.index[first:end] = array("i", [UNKNOWN]) * count
+        self.exist[first:end] = array("b", [0]) * count
+        self.name[first:end] = [None] * count
+        self.vol[first:end] = array("d", [NAN]) * count
+        self.pan[first:end] = array("d", [NAN]) * count
+        self.armed[first:end] = array("b", [UNKNOWN]) * count
+        self.selected[first:end] = array("b", [UNKNOWN]) * count
+        self.solo[first:end] = array("b", [UNKNOWN]) * count
+        self.muted[first:end] = array("b", [UNKNOWN]) * count
+
+def clearSlot(states: TrackStates, slot: int):
+    """ Clears a track slot on the device and forgets what it showed, marking it with the CLEARED index. """
+    states.reset(slot, slot)
+    states.index[slot] = CLEARED
+
+    message_queue.queue(nihia.mixer.setTrackExist, slot, 0)
+    message_queue.queue(nihia.mixer.setTrackName, slot, "")
+    message_queue.queue(nihia.mixer.setTrackVol, slot, " ")
+    message_queue.queue(nihia.mixer.setTrackVolGraph, slot, 0)
+    message_queue.queue(nihia.mixer.setTrackPan, slot, " ")
+    message_queue.queue(nihia.mixer.setTrackPanGraph, slot, 0)
+    message_queue.queue(nihia.mixer.setTrackArm, slot, 0)
+    message_queue.queue(nihia.mixer.setTrackSel, slot, 0)
+    message_queue.queue(nihia.mixer.setTrackSolo, slot, 0)
+    message_queue.queue(nihia.mixer.setTrackMute, slot, 0)
+
+def slotField(name: str):
+    """ Returns a property that reads and writes the given field of `TrackStates` for the slot of a `Track`. """
+    def get(self):
+        return getattr(self.states, name)[self.id]
+
+    def set(self, value):
+        getattr(self.states, name)[self.id] = value
+
+    return property(get, set)
 
-        # Solo state
-        self.solo = None
+class Track:
+    """ View of a single track slot over the arrays of `TrackStates`. """
+    __slots__ = ("id", "states")
+
+    index = slotField("index")
+    exist = slotField("exist")
+    name = slotField("name")
+    vol = slotField("vol")
+    pan = slotField("pan")
+    armed = slotField("armed")
+    selected = slotField("selected")
+    solo = slotField("solo")
+    muted = slotField("muted")
+
+    def __init__(self, id: int, states: TrackStates):
+        # Physical ID of the track, from 0 to 7
+        self.id = id
 
-        # Mute state
-        self.muted = None
+        # Arrays storing the state of the track
+        self.states = states
 
-    def update(self, trackFirst):
+    def update(self, trackFirst, shadow, fields=FIELD_ALL):
         # Disable track if it doesn't exist
 
         # Update track on the device if it exists
+        states = self.states
+        slot = self.id
+
         # Index
-        self.index = trackFirst + self.id
+        index = states.index[slot] = trackFirst + slot
 
         # Existence is updated by the parent object `mixer_obj`
 
+        # Only the fields set on `fields` are checked, reading them from the mixer copy on `shadow`
+
         # Name
-        if mixer.getTrackName(self.index) != self.name:
-            self.name = mixer.getTrackName(self.index)                          # Update cache
-            nihia.mixer.setTrackName(self.id, mixer.getTrackName(self.index))   # Update device
+        if fields & FIELD_NAME:
+            name = shadow.get(FIELD_NAME, index)
+            if name != states.name[slot]:
+                states.name[slot] = name                                            # Update cache
+                message_queue.queue(nihia.mixer.setTrackName, slot, name)           # Update device
         
         # Volume and volume graph
-        if mixer.getTrackVolume(self.index) != self.vol:
-            self.vol = mixer.getTrackVolume(self.index)
-            nihia.mixer.setTrackVol(self.id, str(VolTodB(mixer.getTrackVolume(self.index))) + " dB")
-            nihia.mixer.setTrackVolGraph(self.id, mixer.getTrackVolume(self.index))
+        if fields & FIELD_VOL:
+            vol = shadow.get(FIELD_VOL, index)
+            if vol != states.vol[slot]:
+                states.vol[slot] = vol
+                message_queue.queue(nihia.mixer.setTrackVol, slot, volToString(vol))
+                message_queue.queue(nihia.mixer.setTrackVolGraph, slot, vol)
 
         # Pan and pan graph
-        if mixer.getTrackPan(self.index) != self.pan:
-            self.pan = mixer.getTrackPan(self.index)
-            
-            # Centered
-            if mixer.getTrackPan(self.index) == 0:
-                nihia.mixer.setTrackPan(self.id, "Centered")
-            
-            # Right
-            elif mixer.getTrackPan(self.index) > 0:
-                nihia.mixer.setTrackPan(self.id, str(round((abs(mixer.getTrackPan(self.index)) * 100))) + "% " + "Right")
-
-            # Left
-            elif mixer.getTrackPan(self.index) < 0:
-                nihia.mixer.setTrackPan(self.id, str(round((abs(mixer.getTrackPan(self.index)) * 100))) + "% " + "Left")
-
-            nihia.mixer.setTrackPanGraph(self.id, mixer.getTrackPan(self.index))
+        if fields & FIELD_PAN:
+            pan = shadow.get(FIELD_PAN, index)
+            if pan != states.pan[slot]:
+                states.pan[slot] = pan
+                message_queue.queue(nihia.mixer.setTrackPan, slot, panToString(pan))
+                message_queue.queue(nihia.mixer.setTrackPanGraph, slot, pan)
         
         # Armed for recording state
-        if mixer.isTrackArmed(self.index) != self.armed:
-            self.armed = mixer.isTrackArmed
-            nihia.mixer.setTrackArm(self.id, mixer.isTrackArmed(self.index))
+        if fields & FIELD_ARM:
+            armed = shadow.get(FIELD_ARM, index)
+            if armed != states.armed[slot]:
+                states.armed[slot] = armed
+                message_queue.queue(nihia.mixer.setTrackArm, slot, armed)
         
         # Selection state
-        if mixer.isTrackSelected(self.index) != self.selected:
-            self.selected = mixer.isTrackSelected(self.index)
-            nihia.mixer.setTrackSel(self.id, mixer.isTrackSelected(self.index))
+        if fields & FIELD_SEL:
+            selected = shadow.get(FIELD_SEL, index)
+            if selected != states.selected[slot]:
+                states.selected[slot] = selected
+                message_queue.queue(nihia.mixer.setTrackSel, slot, selected)
 
         # Solo state
-        if mixer.isTrackSolo(self.index) != self.solo:
-            self.solo = mixer.isTrackSolo(self.index)
-            nihia.mixer.setTrackSolo(self.id, mixer.isTrackSolo(self.index))
+        if fields & FIELD_SOLO:
+            solo = shadow.get(FIELD_SOLO, index)
+            if solo != states.solo[slot]:
+                states.solo[slot] = solo
+                message_queue.queue(nihia.mixer.setTrackSolo, slot, solo)
         
         # Mute state
-        if mixer.isTrackMuted(self.index) != self.muted:
-            self.muted = mixer.isTrackMuted(self.index)
-            nihia.mixer.setTrackMute(self.id, mixer.isTrackMuted(self.index))
+        if fields & FIELD_MUTE:
+            muted = shadow.get(FIELD_MUTE, index)
+            if muted != states.muted[slot]:
+                states.muted[slot] = muted
+                message_queue.queue(nihia.mixer.setTrackMute, slot, muted)
 
     def clear(self):
-        self.__init__(self.id)
-
-        nihia.mixer.setTrackExist(self.id, 0)
-        nihia.mixer.setTrackName(self.id, "")
-        nihia.mixer.setTrackVol(self.id, " ")
-        nihia.mixer.setTrackVolGraph(self.id, 0)
-        nihia.mixer.setTrackPan(self.id, " ")
-        nihia.mixer.setTrackPanGraph(self.id, 0)
-        nihia.mixer.setTrackArm(self.id, 0)
-        nihia.mixer.setTrackSel(self.id, 0)
-        nihia.mixer.setTrackSolo(self.id, 0)
-        nihia.mixer.setTrackMute(self.id, 0)
+        clearSlot(self.states, self.id)
 
 class Mixer:
     def __init__(self):
-        # The mixer section, in groups of 8, that is being currently displayed on the device
+        # Groups the mixer is divided in to be shown on the device
+        trackCount = mixer.trackCount()
+        self.banks = BankMap()
+        self.banks.build(trackCount, config.MIXER_BANK_SIZE, config.MIXER_BANK_OFFSET)
+
+        # The mixer section that is being currently displayed on the device
         self.trackGroup = None
 
         # The first track of the group
         self.trackFirst = None
 
         # Amount of tracks being shown in the display
-        self.trackLimit = 8
+        self.trackLimit = TRACK_SLOTS
+
+        # Whether the device is showing the mixer, instead of another mode using the track slots
+        self.visible = True
 
-        # Initialise mixer tracks on loop and store them in tracks list 
+        # State of every track slot, and a view of each slot stored in tracks list
+        self.states = TrackStates(TRACK_SLOTS)
         self.tracks = []
-        self.tracks += [Track(x) for x in range(8)]
+        self.tracks += [Track(x, self.states) for x in range(TRACK_SLOTS)]
+
+        # Copy of every track of the FL Studio mixer
+        self.shadow = MixerShadow()
+        self.shadow.resize(trackCount)
+
+        # Tracks reported by OnDirtyMixerTrack since the last update, as a bitmask with a bit for each mixer track
+        # Reporting the same track several times sets the same bit, so every track is updated once
+        self.dirtyTracks = 0
 
-        # List of tracks that need to be updated
-        self.need_refresh = []
+        # Fields that need to be updated for each track slot, as bitmasks of FIELD_* values
+        self.dirtyFields = [0] * TRACK_SLOTS
 
-        # Variable to interface with OnDirtyMixerTrack with index -1
-        self.need_full_refresh = False
+        # Fields left to send for each track slot after a bank change or a full refresh, as bitmasks of FIELD_* values
+        # They get sent progressively on OnIdle by `repaint()`
+        self.repaintFields = [0] * TRACK_SLOTS
+        self.repainting = False
 
         # Komplete Kontrol instance ID currently selected
         self.kompleteInstance = None
 
+        # Selected channel the Komplete Kontrol instance was checked on, None if it has to be checked again
+        self.kompleteChannel = None
+
         # Mute and solo status for the currently selected track (for MUTE and SOLO buttons LEDs)
         self.isCurrentTrackMuted = None
         self.isCurrentTrackSolo = None
 
-        # Peak meter values in 0-127 range
-        self.previousPeakValues = []
+        # Peak meter values in 0-127 range, as [peakL_0, peakR_0, peakL_1, peakR_1 ...]
+        # The list is allocated once and updated in place on every meter update
+        self.peakValues = [0] * 16
+
+        # Highest peak values reported since the last peak meter update, in 0-127 range
+        self.heldPeakValues = [0] * 16
+
+        # Time of the last peak meter update
+        self.peakTime = 0.0
 
     def whichTrackGroup(self, track: int) -> int:
-        """ Function that calculates which track group has to be shown on screen by dividing 
-        the mixer in groups of 8. 
+        """ Function that calculates which track group has to be shown on screen.
         ### Arguments 
          - track (int): The mixer track you want to calculate the mixer group for.
 
         ### Returns
-          - The calculated track group, from 0 to 15.
+          - The track group, from 0 to the amount of banks minus one.
         """
+        return self.banks.bankOf[track]
 
-        # Calculates which track group the current track belongs to and truncates the value to get the exact number
-        trackGroup = math.trunc(1/8 * track)
-
-        return trackGroup
+    def markDirty(self, index: int):
+        """ Schedules a mixer track to be updated on the next call to `update()`.
+        ### Arguments
+         - index (int): The mixer track reported by FL Studio, or -1 if every track needs to be updated.
+        """
+        if index == -1:
+            self.shadow.markAllStale()
+            self.markAllDirty()
 
-    def update(self):
-        # Schedules all tracks to be updated if trackGroup changes
-        if (self.need_full_refresh == True):
+        # The fields that changed aren't known until OnRefresh
+        elif index >= 0:
+            self.dirtyTracks |= 1 << index
 
-            # Checks for the 15th group exception to limit track processing
-            if self.trackGroup == 15:
-                self.need_refresh = [0, 1, 2, 3, 4, 5]
+    def markAllDirty(self, fields: int = FIELD_ALL):
+        """ Schedules a repaint of the given fields of every track being shown. The critical fields get sent on the next
+        call to `update()` and the rest progressively by `repaint()`.
+        """
+        for x in range(len(self.repaintFields)):
+            if x < self.trackLimit:
+                self.repaintFields[x] |= fields
             else:
-                self.need_refresh = [0, 1, 2, 3, 4, 5, 6, 7]
+                self.repaintFields[x] = 0
+
+        self.repainting = True
+
+    def update(self, fields: int = FIELD_ALL):
+        """ Updates the mixer on the device.
+        ### Arguments
+         - fields (int): FIELD_* bitmask of the fields that may have changed on the tracks reported by
+         OnDirtyMixerTrack. Use `refreshFields()` to get it from an OnRefresh flag.
+        """
+        # Tracks reported by OnDirtyMixerTrack get the fields that may have changed read again on the mixer copy, and
+        # updated on the device if they are being shown
+        dirtyTracks = self.dirtyTracks
+        while dirtyTracks:
+            bit = dirtyTracks & -dirtyTracks
+            dirtyTracks ^= bit
+            index = bit.bit_length() - 1
+
+            self.shadow.markStale(index, fields)
+
+            if index < self.banks.trackCount and self.banks.bankOf[index] == self.trackGroup:
+                slot = self.banks.slotOf[index]
+                if slot >= 0:
+                    self.dirtyFields[slot] |= fields
+        self.dirtyTracks = 0
+
+        # The mixer copy keeps track of the changes while another mode is using the track slots
+        if not self.visible:
+            return
 
         # Schedules all tracks to be updated if trackGroup changes
-        if (self.whichTrackGroup(mixer.trackNumber()) != self.trackGroup):
+        selectedTrack = host_snapshot.get(mixer.trackNumber)
+        if (self.whichTrackGroup(selectedTrack) != self.trackGroup):
             
-            self.trackGroup = self.whichTrackGroup(mixer.trackNumber())
-            self.trackFirst = self.trackGroup * 8
+            self.trackGroup = self.whichTrackGroup(selectedTrack)
+            self.trackFirst = self.banks.first[self.trackGroup]
+            self.trackLimit = self.banks.size[self.trackGroup]
 
-            # Also checks for the 15th group exception
-            if self.trackGroup == 15:
-                # Update track existence
-                for x in range(6):
-                    self.tracks[x].exist = 1
-                self.tracks[6].clear()
-                self.tracks[7].clear()
-                
-                for x in range(len(self.tracks)):
-                    nihia.mixer.setTrackExist(self.tracks[x].id, self.tracks[x].exist)
-
-                # Limit track processing
-                self.need_refresh = [0, 1, 2, 3, 4, 5]
-                self.trackLimit = 6
-            else:
-                # Update track existence
-                for x in range(len(self.tracks)):
+            # Update track existence, clearing the slots the group doesn't fill
+            for x in range(len(self.tracks)):
+                if x < self.trackLimit:
                     self.tracks[x].exist = 1
+                else:
+                    self.tracks[x].clear()
 
-                for x in range(len(self.tracks)):
-                    nihia.mixer.setTrackExist(self.tracks[x].id, self.tracks[x].exist)
+                message_queue.queue(nihia.mixer.setTrackExist, self.tracks[x].id, self.tracks[x].exist)
 
-                # Limit track processing
-                self.need_refresh = [0, 1, 2, 3, 4, 5, 6, 7]
-                self.trackLimit = 8
+            # Limit track processing
+            self.markAllDirty()
 
             # Updates FL Studio mixer rectangle halo
             if config.MIXER_HALO_BEHAVIOR == 1:
                 ui.miDisplayRect(self.trackFirst, self.trackFirst + self.trackLimit - 1, config.MIXER_HALO_TIME)
 
         # Updates mute and solo status of the currently selected track (for MUTE and SOLO button lights)
-        if mixer.isTrackMuted(mixer.trackNumber()) != self.isCurrentTrackMuted:
-            self.isCurrentTrackMuted = mixer.isTrackMuted(mixer.trackNumber())
-            nihia.mixer.setCurrentTrackMuted(mixer.isTrackMuted(mixer.trackNumber()))
+        isCurrentTrackMuted = host_snapshot.get(mixer.isTrackMuted, selectedTrack)
+        if isCurrentTrackMuted != self.isCurrentTrackMuted:
+            self.isCurrentTrackMuted = isCurrentTrackMuted
+            message_queue.queue(nihia.mixer.setCurrentTrackMuted, isCurrentTrackMuted)
         
-        if mixer.isTrackSolo(mixer.trackNumber()) != self.isCurrentTrackSolo:
-            self.isCurrentTrackSolo = mixer.isTrackSolo(mixer.trackNumber())
-            nihia.mixer.setCurrentTrackSolo(mixer.isTrackSolo(mixer.trackNumber()))
-
-        # Updates scheduled tracks
-        for x in range(len(self.need_refresh)):
-            self.tracks[self.need_refresh[x]].update(self.trackFirst)
+        isCurrentTrackSolo = host_snapshot.get(mixer.isTrackSolo, selectedTrack)
+        if isCurrentTrackSolo != self.isCurrentTrackSolo:
+            self.isCurrentTrackSolo = isCurrentTrackSolo
+            message_queue.queue(nihia.mixer.setCurrentTrackSolo, isCurrentTrackSolo)
+
+        # Repaints send the critical fields of every track and the whole selected track right away, and everything if
+        # progressive repaint is disabled on the config file
+        if self.repainting:
+            selectedSlot = selectedTrack - self.trackFirst
+
+            for x in range(self.trackLimit):
+                if x == selectedSlot or config.MIXER_REPAINT_BUDGET <= 0:
+                    self.dirtyFields[x] |= self.repaintFields[x]
+                else:
+                    self.dirtyFields[x] |= self.repaintFields[x] & REPAINT_CRITICAL
+
+        # Updates the scheduled fields of every track being shown
+        for x in range(self.trackLimit):
+            fields = self.dirtyFields[x]
+            if fields:
+                self.tracks[x].update(self.trackFirst, self.shadow, fields)
+                self.repaintFields[x] &= ~fields
         
         # Resets update queue
-        self.need_refresh = []
-
-        # Checks Komplete Kontrol instance
-        if plugins.isValid(channels.selectedChannel()) == True:                                   # Checks if plugin exists
-            if plugins.getPluginName(channels.selectedChannel()) == "Komplete Kontrol":           # Checks if plugin is Komplete Kontrol
-                if self.kompleteInstance != plugins.getParamName(0, channels.selectedChannel()):  # Checks against cache and updates if necessary
-                    self.kompleteInstance = plugins.getParamName(0, channels.selectedChannel())
-                    nihia.mixer.setKompleteInstance(plugins.getParamName(0, channels.selectedChannel()))
-            
-            else:
-                if self.kompleteInstance != "":  # Checks against cache and updates if necessary
-                    self.kompleteInstance = ""
-                    nihia.mixer.setKompleteInstance("")
+        for x in range(len(self.dirtyFields)):
+            self.dirtyFields[x] = 0
 
-        else:
-            if self.kompleteInstance != "":  # Checks against cache and updates if necessary
-                self.kompleteInstance = ""
-                nihia.mixer.setKompleteInstance("")
+    def repaint(self):
+        """ Sends the fields left by the last repaint, one field of one track at a time, until the time budget set on the
+        config file for each idle tick runs out.
+        """
+        if not self.repainting or self.trackFirst is None or not self.visible:
+            return
+
+        deadline = time.perf_counter() + config.MIXER_REPAINT_BUDGET / 1000000
+
+        for field in REPAINT_ORDER:
+            for x in range(self.trackLimit):
+                if self.repaintFields[x] & field:
+                    self.tracks[x].update(self.trackFirst, self.shadow, field)
+                    self.repaintFields[x] &= ~field
+
+                    if time.perf_counter() >= deadline:
+                        return
+
+        self.repainting = False
+
+    def prefetch(self):
+        """ Reads the stale fields of the groups of tracks next to the one being shown, so switching to them paints from
+        the mixer copy. Runs once the repaint is done, until the time budget set on the config file for each idle tick
+        runs out.
+        """
+        if self.repainting or self.trackFirst is None or config.MIXER_PREFETCH_BUDGET <= 0:
+            return
+
+        shadow = self.shadow
+        stale = shadow.stale
+        deadline = None
+
+        banks = self.banks
+        previous = max(self.trackGroup - 1, 0)
+        following = min(self.trackGroup + 1, len(banks.first) - 1)
+
+        for index in range(banks.first[previous], banks.first[following] + banks.size[following]):
+            if not stale[index]:
+                continue
+
+            if deadline is None:
+                deadline = time.perf_counter() + config.MIXER_PREFETCH_BUDGET / 1000000
+
+            for field in REPAINT_ORDER:
+                if stale[index] & field:
+                    shadow.get(field, index)
+
+                    if time.perf_counter() >= deadline:
+                        return
+
+    def show(self):
+        """ Makes the device show the mixer again after `hide()`, repainting the whole mixer from the mixer copy. """
+        self.visible = True
+
+        # Whatever the other mode showed on the device gets replaced as if switching to another group of tracks
+        self.states.reset()
+        self.trackGroup = None
+        self.update()
+
+    def hide(self):
+        """ Leaves the track slots of the device to another mode. The mixer copy keeps getting updated meanwhile. """
+        self.visible = False
+
+        # Peak meters go down instead of freezing on the last values
+        if any(self.peakValues):
+            for x in range(16):
+                self.peakValues[x] = self.heldPeakValues[x] = 0
+
+            nihia.mixer.sendPeakMeterData(self.peakValues)
+
+    def updateKompleteInstance(self):
+        """ Updates the Komplete Kontrol instance the device controls, taken from the plugin on the selected channel. """
+        selectedChannel = host_snapshot.get(channels.selectedChannel)
+
+        # The plugin is only checked again when the selected channel changes or `invalidateKompleteInstance()` is called
+        if selectedChannel == self.kompleteChannel:
+            return
+
+        self.kompleteChannel = selectedChannel
+
+        kompleteInstance = ""
+        if host_snapshot.get(plugins.isValid, selectedChannel) == True:                               # Checks if plugin exists
+            if host_snapshot.get(plugins.getPluginName, selectedChannel) == "Komplete Kontrol":       # Checks if plugin is Komplete Kontrol
+                kompleteInstance = host_snapshot.get(plugins.getParamName, 0, selectedChannel)
+
+        if self.kompleteInstance != kompleteInstance:                                                   # Checks against cache and updates if necessary
+            self.kompleteInstance = kompleteInstance
+            message_queue.queue(nihia.mixer.setKompleteInstance, kompleteInstance)
+
+    def invalidateKompleteInstance(self, flag: int = 0):
+        """ Makes the plugin on the selected channel be checked again on the next `updateKompleteInstance()`. """
+        self.kompleteChannel = None
 
     def sendPeakInfo(self):
         """ Method to serially update peak meter values shown on the screen of S-Series MK2 devices. 
+
+        Peak values are held on every call, but the device only gets updated at the rate set on the config file.
         """
+        if not self.visible:
+            return
 
-        # Creates peakList if peak values are going to be updated
-        peakList = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+        heldPeakValues = self.heldPeakValues
 
-        # Gets the 16 peak values that need to be reported to the device by building a list [peakL_0, peakR_0, peakL_1, peakR_1 ...]
-        for x in range(self.trackFirst, self.trackFirst + self.trackLimit):
-            peakList[(x - self.trackFirst) * 2] = mixer.getTrackPeaks(x, midi.PEAK_L)
-            peakList[(x - self.trackFirst) * 2 + 1] = mixer.getTrackPeaks(x, midi.PEAK_R)
+        # Gets the 16 peak values that need to be reported to the device and performs the 0-1.1 to 0-127 range conversion
+        # to make cache more conscious about actual changes regarding the information that the device actually utilizes
+        for x in range(16):
+            track = x >> 1
 
-        # Performs 0-1.1 to 0-127 range conversion to make cache more conscious about actual changes regarding
-        # the information that the device actually utilizes
-        for x in range(0, 16):
-            # Makes the max of the peak meter on the device match the one on FL Studio (values that FL Studio gives seem to be infinite)
-            if peakList[x] > 1.1:
-                peakList[x] = 1.1
-        
-            # Translates the 0-1.1 range to 0-127 range
-            peakList[x] = peakList[x] * (127 / 1.1)
-        
-            # Truncates the possible decimals and declares the number as an integer to avoid errors in the translation of the data
-            peakList[x] = int(math.trunc(peakList[x]))
+            if track < self.trackLimit:
+                peak = mixer.getTrackPeaks(self.trackFirst + track, PEAK_CHANNELS[x & 1])
+
+                # Makes the max of the peak meter on the device match the one on FL Studio (values that FL Studio gives seem to be infinite)
+                value = PEAK_CLIP if peak >= PEAK_MAX else int(peak * PEAK_SCALE)
+
+                # Holds the value until the next update if it is the highest one since the last update
+                if value > heldPeakValues[x]:
+                    heldPeakValues[x] = value
+
+        # Limits the peak meter update rate, using a lower one while FL Studio is stopped
+        now = time.perf_counter()
+        elapsed = now - self.peakTime
+
+        if host_snapshot.get(transport.isPlaying):
+            interval = PEAK_INTERVAL
+        else:
+            interval = PEAK_INTERVAL_STOPPED
+
+        if elapsed < interval:
+            return
+
+        self.peakTime = now
+
+        # Amount of steps the meters fall since the last update
+        decay = int(config.PEAK_METER_DECAY * elapsed)
+
+        peakValues = self.peakValues
+        changed = False
+
+        for x in range(16):
+            # Meters fall at the decay speed unless a higher peak has been held since the last update
+            value = peakValues[x] - decay
+
+            if value < heldPeakValues[x]:
+                value = heldPeakValues[x]
+
+            heldPeakValues[x] = 0
 
-        if peakList != self.previousPeakValues:
             # Updates peak values on the cache
-            self.previousPeakValues = peakList
+            if value != peakValues[x]:
+                peakValues[x] = value
+                changed = True
 
-            # Updates peak values on the device
-            nihia.mixer.sendPeakMeterData(peakList)
+        # Updates peak values on the device
+        if changed:
+            nihia.mixer.sendPeakMeterData(peakValues)
 
 def VolTodB(value: float):
 
@@ -302,3 +725,88 @@ def VolTodB(value: float):
         dB = round(math.log10(dB) * 20, 1)
 
     return dB
+
+def volToString(value: float) -> str:
+    """ Returns the string shown on the device for a mixer track volume.
+    ### Arguments
+     - value (float): The volume of the track, from 0 to 1.
+    """
+    step = min(max(round(value * VOL_STEPS), 0), VOL_STEPS)
+    string = volStrings[step]
+
+    if string is None:
+        string = volStrings[step] = str(VolTodB(step / VOL_STEPS)) + " dB"
+
+    return string
+
+def panToString(value: float) -> str:
+    """ Returns the string shown on the device for a mixer track pan.
+    ### Arguments
+     - value (float): The pan of the track, from -1 (left) to 1 (right).
+    """
+    # Centered
+    if value == 0:
+        return "Centered"
+
+    # Right
+    elif value > 0:
+        return PAN_STRINGS_RIGHT[round(value * 100)]
+
+    # Left
+    else:
+        return PAN_STRINGS_LEFT[round(-value * 100)]
+
+def refreshFields(flag: int) -> int:
+    """ Returns the FIELD_* bitmask of the track fields that may have changed for an OnRefresh flag.
+    ### Arguments
+     - flag (int): The flag received by OnRefresh, with at least one of the REFRESH_FLAGS set.
+    """
+    fields = 0
+    for mask, maskFields in REFRESH_FIELDS:
+        if flag & mask:
+            fields |= maskFields
+
+    return fields
+
+def queueSteps(runs: list, step: float, count: int):
+    """ Adds steps to a list of runs of steps, as [[step, count], ...], to be applied with `applySteps()`.
+    ### Arguments
+     - runs (list): The runs of steps waiting to be applied.
+     - step (float): Size of each step, always positive.
+     - count (int): Amount of steps, negative to decrease.
+    """
+    # Steps of the same size and direction as the last ones are counted together, so no floats get summed
+    if runs and runs[-1][0] == step and (runs[-1][1] > 0) == (count > 0):
+        runs[-1][1] += count
+    else:
+        runs.append([step, count])
+
+def applySteps(value: float, runs: list, low: float, high: float):
+    """ Returns the value after applying a list of runs of steps from `queueSteps()`, or None if it doesn't change.
+
+    The result is the same as applying every step on its own: each run of steps is clamped to the range of the value,
+    and steps that cancel each other out without reaching a limit leave it unchanged.
+    ### Arguments
+     - value (float): The value before the steps.
+     - runs (list): The runs of steps.
+     - low (float), high (float): The range of the value.
+    """
+    start = value
+
+    # A run goes in a single direction, so clamping its total is the same as clamping each of its steps
+    clamped = False
+    netCounts = {}
+
+    for step, count in runs:
+        value += step * count
+
+        if value < low or value > high:
+            value = min(max(value, low), high)
+            clamped = True
+
+        netCounts[step] = netCounts.get(step, 0) + count
+
+    if value == start or (not clamped and not any(netCounts.values())):
+        return None
+
+    return value
@@ -0,0 +1,303 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Plugin control mode: the eight knobs and track slots of the device show pages of the parameters of the plugin whose
+window is focused, either the generator of a channel or an effect of a mixer track.
+"""
+
+import plugins
+import midi
+import ui
+from array import array
+
+import host_snapshot
+import message_queue
+import nihia.mixer
+from mixer_definition import TRACK_SLOTS, NAN, CLEARED, TrackStates, clearSlot, queueSteps, applySteps
+
+# Value the volume graph of the device is full at
+GRAPH_MAX = 1.25
+
+# OnRefresh flags that may report a change of the plugin loaded on a channel, which is checked again before using what
+# is known of it
+PLUGIN_CHECK_FLAGS = midi.HW_ChannelEvent
+
+# OnRefresh flags that may report a change of the parameter names of a plugin
+PLUGIN_NAME_FLAGS = midi.HW_Dirty_Names | midi.HW_Dirty_RemoteLinks
+
+# OnRefresh flags that report a change of the parameter values of a plugin: ControlValues for the changes made on the
+# plugin window or by automation, RemoteLinkValues for the ones made on linked controls
+PLUGIN_VALUE_FLAGS = midi.HW_Dirty_ControlValues | midi.HW_Dirty_RemoteLinkValues
+
+# Every OnRefresh flag the plugin control mode handles
+PLUGIN_FLAGS = PLUGIN_CHECK_FLAGS | PLUGIN_NAME_FLAGS | PLUGIN_VALUE_FLAGS
+
+# Form IDs of the windows of mixer effects, which are (track << 22) + (slot << 16), start at this value. Lower ones are
+# the windows of channel generators, with the channel as the ID
+EFFECT_FORM_ID = 1 << 16
+
+def focusedPlugin():
+    """ Returns the plugin whose window is focused as (index, slotIndex), the way the `plugins` module takes them, or
+    None if the focused window isn't a plugin. Generators have a slotIndex of -1.
+    """
+    if not host_snapshot.get(ui.getFocused, midi.widPlugin):
+        return None
+
+    formID = host_snapshot.get(ui.getFocusedFormID)
+
+    if formID < 0:
+        return None
+
+    elif formID >= EFFECT_FORM_ID:
+        return (formID >> 22, (formID >> 16) & 63)
+
+    return (formID, -1)
+
+class PluginInfo:
+    """ What is known of a plugin.
+
+    Parameter names, values and display strings are read from FL Studio the first time they are shown and kept until
+    an OnRefresh flag reports they may have changed, so going through the pages of a plugin only reads the parameters
+    that were never shown.
+    """
+    def __init__(self, name: str, count: int):
+        # Name of the plugin and amount of parameters it has, to tell if it's still the same plugin
+        self.name = name
+        self.count = count
+
+        # Parameter names, values and display strings, None or NaN until read
+        self.names = [None] * count
+        self.values = array("d", [NAN]) * count
+        self.strings = [None] * count
+
+        # Page of parameters being shown
+        self.page = 0
+
+        # Whether the plugin has been checked to be still loaded since the last PLUGIN_CHECK_FLAGS
+        self.checked = True
+
+    def forgetNames(self):
+        self.names[:] = [None] * self.count
+
+    def forgetValues(self):
+        self.values[:] = array("d", [NAN]) * self.count
+        self.strings[:] = [None] * self.count
+
+    def pageCount(self) -> int:
+        return max((self.count + TRACK_SLOTS - 1) // TRACK_SLOTS, 1)
+
+class PluginControl:
+    def __init__(self):
+        # What is known of every plugin, as {(index, slotIndex): PluginInfo}
+        self.plugins = {}
+
+        # Plugin being shown, as (index, slotIndex), or None
+        self.target = None
+
+        # Whether the device is showing the plugin parameters instead of the mixer
+        self.visible = False
+
+        # What the device shows on every track slot while visible
+        self.states = TrackStates(TRACK_SLOTS)
+
+        # Parameter value changes made with the knobs that are waiting to be applied, as
+        # {(index, slotIndex, parameter): [[step, count], ...]}, with a run of steps of the same size and direction per
+        # item
+        self.changes = {}
+
+    def pluginInfo(self, target: tuple):
+        """ Returns the `PluginInfo` of a plugin, given as (index, slotIndex), or None if there's no plugin there. """
+        if target is None:
+            return None
+
+        info = self.plugins.get(target)
+
+        if info is not None and info.checked:
+            return info
+
+        if not host_snapshot.get(plugins.isValid, *target):
+            self.plugins.pop(target, None)
+            return None
+
+        name = host_snapshot.get(plugins.getPluginName, *target)
+        count = host_snapshot.get(plugins.getParamCount, *target)
+
+        # Another plugin got loaded on the channel or the effect slot
+        if info is None or info.name != name or info.count != count:
+            info = self.plugins[target] = PluginInfo(name, count)
+
+        info.checked = True
+        return info
+
+    def invalidate(self, flag: int):
+        """ Forgets what OnRefresh reports may have changed on the plugins. """
+        for info in self.plugins.values():
+            if flag & PLUGIN_CHECK_FLAGS:
+                info.checked = False
+
+            if flag & PLUGIN_NAME_FLAGS:
+                info.forgetNames()
+
+            if flag & PLUGIN_VALUE_FLAGS:
+                info.forgetValues()
+
+        self.update()
+
+    def setTarget(self, target: tuple):
+        """ Sets the plugin to show, as (index, slotIndex), updating the device if it changed. """
+        if target != self.target:
+            self.target = target
+            self.update()
+
+    def show(self):
+        """ Makes the device show the plugin parameters. The mixer has to be hidden first. """
+        self.visible = True
+        self.states.reset()
+        self.update()
+
+    def hide(self):
+        self.visible = False
+        self.changes.clear()
+
+    def update(self):
+        """ Updates the parameters of the page being shown on the device. """
+        if not self.visible:
+            return
+
+        target = self.target
+        info = self.pluginInfo(target)
+        states = self.states
+
+        for slot in range(TRACK_SLOTS):
+            parameter = slot + info.page * TRACK_SLOTS if info is not None else -1
+
+            # Slots past the last parameter, cleared unless they already are
+            if info is None or parameter >= info.count:
+                if states.index[slot] != CLEARED:
+                    clearSlot(states, slot)
+                continue
+
+            if states.exist[slot] != 1:
+                states.exist[slot] = 1
+                message_queue.queue(nihia.mixer.setTrackExist, slot, 1)
+
+            # Another parameter on the slot always gets its value sent
+            if states.index[slot] != parameter:
+                states.index[slot] = parameter
+                states.vol[slot] = NAN
+
+            # Name
+            name = info.names[parameter]
+            if name is None:
+                name = info.names[parameter] = host_snapshot.get(plugins.getParamName, parameter, *target)
+
+            if name != states.name[slot]:
+                states.name[slot] = name
+                message_queue.queue(nihia.mixer.setTrackName, slot, name)
+
+            # Value and its display string, shown as the volume of the slot
+            value = info.values[parameter]
+            if value != value:
+                value = info.values[parameter] = host_snapshot.get(plugins.getParamValue, parameter, *target)
+
+            if value != states.vol[slot]:
+                states.vol[slot] = value
+
+                string = info.strings[parameter]
+                if string is None:
+                    string = info.strings[parameter] = host_snapshot.get(plugins.getParamValueString, parameter, *target)
+
+                message_queue.queue(nihia.mixer.setTrackVol, slot, string)
+                message_queue.queue(nihia.mixer.setTrackVolGraph, slot, value * GRAPH_MAX)
+
+            # The rest of the slot isn't used
+            if states.pan[slot] != 0:
+                states.pan[slot] = 0
+                states.armed[slot] = states.selected[slot] = states.solo[slot] = states.muted[slot] = 0
+                message_queue.queue(nihia.mixer.setTrackPan, slot, " ")
+                message_queue.queue(nihia.mixer.setTrackPanGraph, slot, 0)
+                message_queue.queue(nihia.mixer.setTrackArm, slot, 0)
+                message_queue.queue(nihia.mixer.setTrackSel, slot, 0)
+                message_queue.queue(nihia.mixer.setTrackSolo, slot, 0)
+                message_queue.queue(nihia.mixer.setTrackMute, slot, 0)
+
+    def changePage(self, direction: int):
+        """ Shows the previous (-1) or the next (1) page of parameters of the plugin being shown. """
+        info = self.pluginInfo(self.target)
+
+        if info is None:
+            return
+
+        page = min(max(info.page + direction, 0), info.pageCount() - 1)
+
+        if page != info.page:
+            info.page = page
+            self.update()
+
+    def adjust(self, knob: int, step: float, count: int):
+        """ Schedules `count` steps of size `step` (negative count to decrease) of the parameter shown on a knob,
+        applied on the next call to `applyChanges()`.
+        """
+        info = self.pluginInfo(self.target)
+
+        if info is None:
+            return
+
+        parameter = knob + info.page * TRACK_SLOTS
+        if parameter >= info.count:
+            return
+
+        queueSteps(self.changes.setdefault(self.target + (parameter,), []), step, count)
+
+    def applyChanges(self):
+        """ Applies the parameter changes accumulated by `adjust()` since the last call, writing each parameter once.
+
+        The result is the same as applying every step on its own (see `mixer_definition.applySteps()`).
+        """
+        if not self.changes:
+            return
+
+        written = False
+
+        for (index, slotIndex, parameter), runs in self.changes.items():
+            value = applySteps(host_snapshot.get(plugins.getParamValue, parameter, index, slotIndex), runs, 0.0, 1.0)
+
+            if value is None:
+                continue
+
+            plugins.setParamValue(value, parameter, index, slotIndex)
+            written = True
+
+            # FL Studio reports the change later on with PLUGIN_VALUE_FLAGS, but the value shown has to be read again
+            # on this update already
+            info = self.plugins.get((index, slotIndex))
+            if info is not None:
+                info.values[parameter] = NAN
+                info.strings[parameter] = None
+
+        self.changes.clear()
+
+        # Values read before the changes aren't valid anymore
+        if written:
+            host_snapshot.reset()
+            self.update()
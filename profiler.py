@@ -0,0 +1,142 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Opt-in profiler for the script callbacks and MIDI handlers.
+
+Functions wrapped with `wrap()` record how many times they are called and how long each call takes on a histogram with
+power of two buckets, which only costs two clock reads and a few integer operations per call. `dump()` prints or writes
+a summary of every histogram.
+"""
+
+import time
+
+import nihia.buttons
+import nihia.mixer
+
+# Amount of histogram buckets. Bucket n counts the calls that took less than 2^n microseconds, and the last one also
+# counts every call slower than that
+BUCKETS = 24
+
+class Histogram:
+    """ Latency histogram of a single callback or handler. """
+    def __init__(self, name: str):
+        self.name = name
+
+        # Amount of calls, total time and slowest call in nanoseconds
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+        # Amount of calls per bucket
+        self.buckets = [0] * BUCKETS
+
+    def add(self, elapsed: int):
+        """ Records a call that took `elapsed` nanoseconds. """
+        self.count += 1
+        self.total += elapsed
+
+        if elapsed > self.max:
+            self.max = elapsed
+
+        bucket = (elapsed // 1000).bit_length()
+        self.buckets[bucket if bucket < BUCKETS else BUCKETS - 1] += 1
+
+    def percentile(self, fraction: float) -> int:
+        """ Returns the upper bound, in microseconds, of the bucket the given fraction of the calls falls in. """
+        target = self.count * fraction
+        accumulated = 0
+
+        for bucket in range(BUCKETS):
+            accumulated += self.buckets[bucket]
+            if accumulated >= target:
+                return 2 ** bucket
+
+        return 2 ** (BUCKETS - 1)
+
+# Histograms of every profiled function, by name
+histograms = {}
+
+def wrap(name: str, function):
+    """ Returns a version of `function` that records its calls on the histogram named `name`. Functions wrapped with the
+    same name share the same histogram.
+    """
+    histogram = histograms.get(name)
+
+    if histogram is None:
+        histogram = histograms[name] = Histogram(name)
+
+    clock = time.perf_counter_ns
+
+    def profiled(*args):
+        start = clock()
+        try:
+            return function(*args)
+        finally:
+            histogram.add(clock() - start)
+
+    return profiled
+
+def wrapHandlers(handlers: dict):
+    """ Wraps every handler of a MIDI dispatch table in place, naming each one after the button or knob it handles. """
+    # DATA1 values of buttons and knobs to their names
+    names = {data1: name for name, data1 in nihia.buttons.button_list.items()}
+
+    for knob in range(8):
+        names[nihia.mixer.knobs[0][knob]] = "KNOB_" + str(knob + 1)
+        names[nihia.mixer.knobs[1][knob]] = "KNOB_" + str(knob + 1) + "_SHIFTED"
+
+    # The same handler is registered for many messages, so each one gets wrapped only once
+    wrapped = {}
+
+    for key, handler in handlers.items():
+        if id(handler) not in wrapped:
+            wrapped[id(handler)] = wrap("OnMidiMsg > " + names.get(key[0], str(key[0])), handler)
+
+        handlers[key] = wrapped[id(handler)]
+
+def summary() -> str:
+    """ Returns a table with the call count and latency of every profiled function. """
+    lines = ["{:<40}{:>10}{:>12}{:>11}{:>11}{:>11}{:>11}".format("Function", "Calls", "Total ms", "Mean us", "Max us", "p50 <= us", "p99 <= us")]
+
+    for histogram in sorted(histograms.values(), key=lambda histogram: histogram.total, reverse=True):
+        if histogram.count == 0:
+            continue
+
+        lines.append("{:<40}{:>10}{:>12.2f}{:>11.1f}{:>11.1f}{:>11}{:>11}".format(
+            histogram.name,
+            histogram.count,
+            histogram.total / 1000000,
+            histogram.total / histogram.count / 1000,
+            histogram.max / 1000,
+            histogram.percentile(0.5),
+            histogram.percentile(0.99)))
+
+    return "\n".join(lines)
+
+def dump(path: str = ""):
+    """ Prints the profiler summary on the script output or, if a path is given, writes it to that file. """
+    if path == "":
+        print(summary())
+    else:
+        with open(path, "w") as file:
+            file.write(summary() + "\n")
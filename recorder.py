@@ -0,0 +1,142 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Opt-in recorder of the MIDI messages and callbacks the script receives.
+
+Every call to a function wrapped with `wrap()` is stored as a fixed-size binary record on a ring buffer allocated once,
+so recording costs a clock read and a `struct.pack_into()` per call and never grows past the size set on the config
+file (the oldest records get overwritten). `dump()` writes the recording to a file, which `tools/replay.py` can feed
+to the script outside of FL Studio.
+
+File layout (little endian):
+ - Header: magic (4 bytes), version (uint16), track count (uint16), records (uint32), dropped records (uint32) and
+   device name (32 bytes, UTF-8, zero padded).
+ - Records, oldest first: time in seconds since the recording started (float64), callback (uint8, index on
+   CALLBACKS), MIDI status, data1 and data2 (uint8 each) and callback argument (int32, the flag of OnRefresh or the
+   index of OnDirtyMixerTrack).
+"""
+
+import os
+import struct
+import time
+
+MAGIC = b"KKRC"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHII32s")
+RECORD = struct.Struct("<dBBBBi")
+
+# Callbacks that can be recorded, in the order their indexes are stored
+CALLBACKS = ("OnInit", "OnDeInit", "OnMidiMsg", "OnIdle", "OnRefresh", "OnDirtyMixerTrack", "OnUpdateMeters")
+
+# Ring buffer of records, allocated by `start()`
+buffer = None
+capacity = 0
+
+# Amount of records written since the recording started, including the overwritten ones
+count = 0
+
+# Time the recording started
+startTime = 0.0
+
+# Session information stored on the header
+deviceName = ""
+trackCount = 0
+
+def start(size: int, name: str = "", tracks: int = 0):
+    """ Allocates a ring buffer for `size` records and starts a new recording of the given device and mixer size. """
+    global buffer, capacity, count, startTime, deviceName, trackCount
+
+    capacity = max(size, 1)
+    buffer = bytearray(RECORD.size * capacity)
+    count = 0
+    startTime = time.perf_counter()
+    deviceName = name
+    trackCount = tracks
+
+def record(callback: int, status: int = 0, data1: int = 0, data2: int = 0, argument: int = 0):
+    """ Stores a record on the ring buffer, overwriting the oldest one if it's full. """
+    global count
+
+    RECORD.pack_into(buffer, (count % capacity) * RECORD.size, time.perf_counter() - startTime,
+                     callback, status & 0xFF, data1 & 0xFF, data2 & 0xFF, argument)
+    count += 1
+
+def wrap(name: str, function):
+    """ Returns a version of the callback `function` that records every call before making it. """
+    callback = CALLBACKS.index(name)
+
+    if name == "OnMidiMsg":
+        def recorded(event):
+            record(callback, event.status, event.data1, event.data2)
+            return function(event)
+
+    elif name == "OnRefresh" or name == "OnDirtyMixerTrack":
+        def recorded(argument):
+            record(callback, argument=argument)
+            return function(argument)
+
+    else:
+        def recorded(*args):
+            record(callback)
+            return function(*args)
+
+    return recorded
+
+def dump(path: str = ""):
+    """ Writes the recording to a file. If no path is given, it gets written as `session.kkrec` next to the script. """
+    if buffer is None:
+        return
+
+    if path == "":
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session.kkrec")
+
+    stored = min(count, capacity)
+    oldest = (count - stored) % capacity
+
+    # Device names longer than the header field get cut on a character boundary, so they can still be decoded
+    name = deviceName.encode("utf-8")[:32].decode("utf-8", "ignore").encode("utf-8")
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, trackCount, stored, count - stored, name))
+        file.write(buffer[oldest * RECORD.size:stored * RECORD.size])
+        file.write(buffer[:oldest * RECORD.size])
+
+def load(path: str) -> tuple:
+    """ Reads a recording written by `dump()`.
+
+    ### Returns
+      - (deviceName, trackCount, dropped, records), with records as a list of
+      (time, callback, status, data1, data2, argument) tuples.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    magic, version, tracks, stored, dropped, name = HEADER.unpack_from(data, 0)
+
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a recording of this script: " + path)
+
+    records = list(RECORD.iter_unpack(data[HEADER.size:HEADER.size + stored * RECORD.size]))
+
+    return name.rstrip(b"\0").decode("utf-8", "replace"), tracks, dropped, records
@@ -0,0 +1,206 @@
+"""
+Benchmark of the script callbacks on the offline FL Studio stand-in host.
+
+Runs the script against a simulated session under a mix of events similar to a real one (knob sweeps, 4D Encoder
+navigation and jogging, transport and mixer buttons, peak meters during playback) and reports the latency, host API
+calls and messages sent to the device for every callback.
+
+Usage:
+    python tools/benchmark.py [--device {s,a}] [--tracks N] [--frames N] [--seed N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = os.path.dirname(TOOLS_DIR)
+sys.path.insert(0, os.path.join(TOOLS_DIR, "fl_host"))
+
+import flhost
+import midi
+from flhost import MidiEvent
+
+DEVICES = {
+    "s": "Komplete Kontrol DAW - 1",
+    "a": "Komplete Kontrol A DAW",
+}
+
+CALLBACKS = ("OnMidiMsg", "OnRefresh", "OnIdle", "OnDirtyMixerTrack", "OnUpdateMeters")
+
+
+class CallbackStats:
+    """ Measurements of a single callback. """
+    def __init__(self):
+        self.latencies = []
+        self.hostCalls = 0
+        self.messages = 0
+
+    def summary(self) -> tuple:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        if count == 0:
+            return (0, 0, 0, 0, 0, 0, 0)
+
+        return (
+            count,
+            sum(latencies) / count / 1000,
+            latencies[count // 2] / 1000,
+            latencies[min(int(count * 0.95), count - 1)] / 1000,
+            latencies[-1] / 1000,
+            self.hostCalls / count,
+            self.messages / count,
+        )
+
+
+class Benchmark:
+    """ Drives the callbacks of the script and measures each call. Also works as the target of `Host.deliver()`. """
+    def __init__(self, script):
+        self.script = script
+        self.stats = {name: CallbackStats() for name in CALLBACKS}
+
+    def call(self, name: str, *args):
+        host = flhost.host
+        hostCalls = host.totalCalls() - host.calls["device.midiOutSysex"]
+        messages = len(host.sysex)
+
+        start = time.perf_counter_ns()
+        getattr(self.script, name)(*args)
+        elapsed = time.perf_counter_ns() - start
+
+        stats = self.stats[name]
+        stats.latencies.append(elapsed)
+        stats.hostCalls += host.totalCalls() - host.calls["device.midiOutSysex"] - hostCalls
+        stats.messages += len(host.sysex) - messages
+
+    def OnMidiMsg(self, event):
+        self.call("OnMidiMsg", event)
+
+    def OnRefresh(self, flag):
+        self.call("OnRefresh", flag)
+
+    def OnIdle(self):
+        self.call("OnIdle")
+
+    def OnDirtyMixerTrack(self, index):
+        self.call("OnDirtyMixerTrack", index)
+
+    def OnUpdateMeters(self):
+        self.call("OnUpdateMeters")
+
+
+def buttonEvent(name: str, value: int = 1) -> MidiEvent:
+    import nihia.buttons
+    return MidiEvent(0xBF, nihia.buttons.button_list.get(name), value)
+
+
+def knobEvent(knob: int, speed: int, shifted: bool = False) -> MidiEvent:
+    import nihia.mixer
+    return MidiEvent(0xBF, nihia.mixer.knobs[int(shifted)][knob], speed)
+
+
+def frameEvents(rng: random.Random, host) -> list:
+    """ Returns the MIDI events the keyboard sends during one frame of the simulated session. """
+    action = rng.random()
+
+    # Knob sweep: several events of the same knob in a row
+    if action < 0.45:
+        knob = rng.randrange(8)
+        speed = rng.choice((1, 2, 3, 5, 8, 127, 126, 125, 122, 120))
+        return [knobEvent(knob, speed, rng.random() < 0.3) for x in range(rng.randint(2, 6))]
+
+    # 4D Encoder spin, on the mixer (navigation) or on the playlist (jogging)
+    elif action < 0.60:
+        host.focused = rng.choice((midi.widMixer, midi.widMixer, midi.widPlaylist))
+        value = rng.choice(("PLUS", "MINUS"))
+        return [buttonEvent("ENCODER_GENERAL", buttonEvent(value).data1) for x in range(rng.randint(1, 4))]
+
+    # 4D Encoder spin changing volume or pan of the selected track
+    elif action < 0.70:
+        encoder = rng.choice(("ENCODER_VOLUME_SELECTED", "ENCODER_PAN_SELECTED"))
+        value = buttonEvent(rng.choice(("PLUS", "MINUS"))).data1
+        return [buttonEvent(encoder, value) for x in range(rng.randint(1, 4))]
+
+    # Mixer buttons
+    elif action < 0.78:
+        return [buttonEvent(rng.choice(("MUTE", "SOLO", "TRACK_SELECT", "MUTE_SELECTED", "SOLO_SELECTED")), rng.randrange(8))]
+
+    # Transport and edit buttons
+    elif action < 0.80:
+        return [buttonEvent(rng.choice(("PLAY", "STOP", "METRO", "LOOP", "UNDO")))]
+
+    return []
+
+
+def run(device: str, tracks: int, frames: int, seed: int) -> Benchmark:
+    host = flhost.reset(deviceName=DEVICES[device], trackCount=tracks)
+    script = flhost.loadScript(SCRIPT_DIR)
+    benchmark = Benchmark(script)
+    rng = random.Random(seed)
+
+    script.OnInit()
+    host.playing = 1
+
+    for frame in range(frames):
+        # Incoming MIDI, each message followed by the notifications FL Studio sends after it
+        for event in frameEvents(rng, host):
+            benchmark.OnMidiMsg(event)
+            host.deliver(benchmark)
+
+        # Changes made on FL Studio itself
+        if rng.random() < 0.05:
+            track = rng.randrange(tracks)
+            host.trackVolumes[track] = rng.random()
+            host.notify(midi.HW_Dirty_Mixer_Controls, track)
+            host.deliver(benchmark)
+
+        if rng.random() < 0.02:
+            host.focused = rng.choice((midi.widMixer, midi.widPianoRoll, midi.widPlaylist, midi.widChannelRack))
+
+        # Peak meters, updated by FL Studio on every frame during playback
+        if host.playing:
+            for track in range(tracks):
+                host.trackPeaks[track] = rng.random() * 1.2
+
+        if host.hasMeters:
+            benchmark.OnUpdateMeters()
+
+        benchmark.OnIdle()
+        host.deliver(benchmark)
+
+    script.OnDeInit()
+    return benchmark
+
+
+def printReport(benchmark: Benchmark, title: str):
+    print(title)
+    print("{:<20}{:>8}{:>11}{:>10}{:>10}{:>10}{:>13}{:>13}".format(
+        "callback", "calls", "mean us", "p50 us", "p95 us", "max us", "host/call", "msgs/call"))
+
+    for name in CALLBACKS:
+        count, mean, p50, p95, maximum, hostCalls, messages = benchmark.stats[name].summary()
+        print("{:<20}{:>8}{:>11.2f}{:>10.2f}{:>10.2f}{:>10.2f}{:>13.2f}{:>13.2f}".format(
+            name, count, mean, p50, p95, maximum, hostCalls, messages))
+
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--device", choices=sorted(DEVICES), nargs="*", default=sorted(DEVICES, reverse=True),
+                        help="Devices to simulate: s (S-Series MK2) and/or a (A-Series). Default: both.")
+    parser.add_argument("--tracks", type=int, default=127, help="Amount of mixer tracks, including master and current.")
+    parser.add_argument("--frames", type=int, default=5000, help="Amount of simulated idle frames.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the event mix.")
+    args = parser.parse_args()
+
+    for device in args.device:
+        benchmark = run(device, args.tracks, args.frames, args.seed)
+        printReport(benchmark, "{} ({} tracks, {} frames)".format(DEVICES[device], args.tracks, args.frames))
+
+
+if __name__ == "__main__":
+    main()
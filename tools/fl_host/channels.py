@@ -0,0 +1,101 @@
+""" Stand-in for the FL Studio `channels` module. """
+
+import flhost
+from flhost import api
+import midi
+
+
+def _clamp(value, low, high):
+    return low if value < low else high if value > high else value
+
+
+@api("channels")
+def channelCount(mode=0):
+    return flhost.host.channelCount
+
+
+@api("channels")
+def selectedChannel(canBeNone=0, offset=0, indexGlobal=0):
+    return flhost.host.selectedChannel
+
+
+@api("channels")
+def selectOneChannel(index):
+    host = flhost.host
+    host.channelSelected = [0] * host.channelCount
+    host.channelSelected[index] = 1
+    host.selectedChannel = index
+    flhost.host.notify(midi.HW_ChannelEvent)
+
+
+@api("channels")
+def selectChannel(index, value=-1):
+    host = flhost.host
+    host.channelSelected[index] = int(not host.channelSelected[index]) if value == -1 else value
+    flhost.host.notify(midi.HW_ChannelEvent)
+
+
+@api("channels")
+def isChannelSelected(index):
+    return flhost.host.channelSelected[index]
+
+
+@api("channels")
+def getChannelName(index):
+    return flhost.host.channelNames[index]
+
+
+@api("channels")
+def getChannelVolume(index, mode=0):
+    return flhost.host.channelVolumes[index]
+
+
+@api("channels")
+def setChannelVolume(index, value, pickupMode=0):
+    flhost.host.channelVolumes[index] = _clamp(value, 0.0, 1.0)
+    flhost.host.notify(midi.HW_ChannelEvent)
+
+
+@api("channels")
+def getChannelPan(index):
+    return flhost.host.channelPans[index]
+
+
+@api("channels")
+def setChannelPan(index, value, pickupMode=0):
+    flhost.host.channelPans[index] = _clamp(value, -1.0, 1.0)
+    flhost.host.notify(midi.HW_ChannelEvent)
+
+
+@api("channels")
+def isChannelMuted(index):
+    return flhost.host.channelMuted[index]
+
+
+@api("channels")
+def muteChannel(index, value=-1):
+    host = flhost.host
+    host.channelMuted[index] = int(not host.channelMuted[index]) if value == -1 else value
+    flhost.host.notify(midi.HW_ChannelEvent)
+
+
+@api("channels")
+def isChannelSolo(index):
+    return flhost.host.channelSolo[index]
+
+
+@api("channels")
+def soloChannel(index):
+    host = flhost.host
+    host.channelSolo[index] = int(not host.channelSolo[index])
+    flhost.host.notify(midi.HW_ChannelEvent)
+
+
+@api("channels")
+def showEditor(index, value=-1):
+    pass
+
+
+@api("channels")
+def quickQuantize(index, startOnly=1):
+    pass
@@ -0,0 +1,29 @@
+""" Stand-in for the FL Studio `device` module. """
+
+import flhost
+from flhost import api
+
+
+@api("device")
+def getName():
+    return flhost.host.deviceName
+
+
+@api("device")
+def setHasMeters():
+    flhost.host.hasMeters = True
+
+
+@api("device")
+def midiOutSysex(message):
+    flhost.host.sysex.append(bytes(message))
+
+
+@api("device")
+def midiOutMsg(message, *args):
+    pass
+
+
+@api("device")
+def isAssigned():
+    return True
@@ -0,0 +1,161 @@
+"""
+Shared state of the offline FL Studio stand-in host.
+
+Every stand-in module (``device``, ``mixer``, ``transport``, ``ui``, ``general``, ``channels``, ``plugins``, ``midi`` and
+``nihia``) reads and writes the single `Host` object stored in `host`, so a benchmark or replay can build a session
+with `reset()`, drive the script callbacks and then inspect `host.calls` to know how many host API calls each callback
+made.
+"""
+
+import collections
+import functools
+import importlib
+import os
+import sys
+
+import midi
+
+
+class MidiEvent:
+    """ Minimal stand-in for the event object FL Studio passes to `OnMidiMsg`. """
+    def __init__(self, status: int, data1: int, data2: int):
+        self.status = status
+        self.data1 = data1
+        self.data2 = data2
+        self.handled = False
+
+
+class Host:
+    """ Simulated FL Studio session. """
+    def __init__(self, trackCount: int = 127, channelCount: int = 16, deviceName: str = "Komplete Kontrol DAW - 1"):
+        # Host API call counters, keyed by "module.function"
+        self.calls = collections.Counter()
+
+        # SysEx messages sent to the device
+        self.sysex = []
+
+        # Notifications FL Studio sends to the script after something changes, waiting to be delivered with
+        # `deliver()`: mixer tracks for OnDirtyMixerTrack and flags for OnRefresh
+        self.dirtyTracks = []
+        self.refreshFlags = 0
+
+        # Device
+        self.deviceName = deviceName
+        self.hasMeters = False
+
+        # Mixer
+        self.trackCount = trackCount
+        self.trackNames = ["Master"] + ["Insert " + str(x) for x in range(1, trackCount - 1)] + ["Current"]
+        self.trackVolumes = [0.8] * trackCount
+        self.trackPans = [0.0] * trackCount
+        self.trackArmed = [0] * trackCount
+        self.trackSelected = [0] * trackCount
+        self.trackSolo = [0] * trackCount
+        self.trackMuted = [0] * trackCount
+        self.trackPeaks = [0.0] * trackCount
+        self.selectedTrack = 0
+        self.trackSelected[0] = 1
+
+        # Transport
+        self.playing = 0
+        self.recording = 0
+        self.loopMode = 0
+        self.songPos = 0              # In absolute ticks
+        self.ppq = 96
+        self.songLength = 96 * 4 * 64
+
+        # UI
+        self.focused = 0              # midi.widMixer
+        self.focusedForm = 0          # Channel 0 generator
+        self.precount = 0
+        self.loopRec = 0
+        self.metronome = 0
+
+        # Undo history
+        self.undoPos = 0
+
+        # Channel rack
+        self.channelCount = channelCount
+        self.channelNames = ["Channel " + str(x) for x in range(channelCount)]
+        self.channelVolumes = [0.78125] * channelCount
+        self.channelPans = [0.0] * channelCount
+        self.channelMuted = [0] * channelCount
+        self.channelSolo = [0] * channelCount
+        self.channelSelected = [0] * channelCount
+        self.selectedChannel = 0
+        self.channelSelected[0] = 1
+
+        # Plugins hosted on each channel: {channel: [pluginName, [paramNames], [paramValues]]}
+        self.plugins = {0: ["Komplete Kontrol", ["NIKontakt1"] + ["Param " + str(x) for x in range(1, 512)], [0.0] * 512]}
+
+        # Effects hosted on mixer tracks: {(track, slot): [pluginName, [paramNames], [paramValues]]}
+        self.effects = {(1, 0): ["Fruity Limiter", ["Param " + str(x) for x in range(20)], [0.5] * 20]}
+
+    def count(self, name: str):
+        self.calls[name] += 1
+
+    def notify(self, flags: int, track: int = None):
+        """ Queues the notifications FL Studio would send after a change made through the API. """
+        self.refreshFlags |= flags
+
+        if track is not None:
+            self.dirtyTracks.append(track)
+
+    def deliver(self, script):
+        """ Delivers the queued notifications to the callbacks of the script module, the way FL Studio does right after
+        the callback that made the changes returns.
+        """
+        dirtyTracks, flags = self.dirtyTracks, self.refreshFlags
+        self.dirtyTracks, self.refreshFlags = [], 0
+
+        for track in dirtyTracks:
+            script.OnDirtyMixerTrack(track)
+
+        if flags:
+            script.OnRefresh(flags)
+
+    def totalCalls(self) -> int:
+        return sum(self.calls.values())
+
+
+host = Host()
+
+
+def reset(**kwargs) -> Host:
+    """ Replaces the simulated session with a fresh one built with the given `Host` arguments. """
+    global host
+    host = Host(**kwargs)
+    return host
+
+
+def api(module: str):
+    """ Decorator that counts every call to a stand-in host API function on `host.calls`. """
+    def decorator(function):
+        name = module + "." + function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            host.calls[name] += 1
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def loadScript(scriptDir: str, name: str = "device_KompleteKontrol"):
+    """ Imports a fresh copy of the script module from `scriptDir` along with the script modules next to it, so state
+    left by a previous run is discarded. `reset()` has to be called before, since the script detects the device on import.
+    """
+    scriptDir = os.path.abspath(scriptDir)
+
+    if scriptDir not in sys.path:
+        sys.path.insert(1, scriptDir)
+
+    # Forgets the script modules imported by previous runs
+    for moduleName, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path is not None and os.path.dirname(os.path.abspath(path)) == scriptDir:
+            del sys.modules[moduleName]
+
+    return importlib.import_module(name)
@@ -0,0 +1,34 @@
+""" Stand-in for the FL Studio `general` module. """
+
+import flhost
+from flhost import api
+
+
+@api("general")
+def undoUp():
+    flhost.host.undoPos += 1
+
+
+@api("general")
+def undoDown():
+    flhost.host.undoPos = max(flhost.host.undoPos - 1, 0)
+
+
+@api("general")
+def getUndoHistoryCount():
+    return 10
+
+
+@api("general")
+def getUndoHistoryPos():
+    return flhost.host.undoPos
+
+
+@api("general")
+def getRecPPQ():
+    return flhost.host.ppq
+
+
+@api("general")
+def getRecPPB():
+    return flhost.host.ppq * 4
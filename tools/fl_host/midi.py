@@ -0,0 +1,62 @@
+"""
+Stand-in for the FL Studio `midi` constants module (only the constants the script uses).
+"""
+
+MaxInt = 2147483647
+
+# Window IDs
+widMixer = 0
+widChannelRack = 1
+widPlaylist = 2
+widPianoRoll = 3
+widBrowser = 4
+widPlugin = 5
+
+# OnRefresh flags
+HW_Dirty_Mixer_Sel = 1
+HW_Dirty_Mixer_Display = 2
+HW_Dirty_Mixer_Controls = 4
+HW_Dirty_RemoteLinks = 16
+HW_Dirty_FocusedWindow = 32
+HW_Dirty_Performance = 64
+HW_Dirty_LEDs = 256
+HW_Dirty_RemoteLinkValues = 512
+HW_Dirty_Patterns = 1024
+HW_Dirty_Tracks = 2048
+HW_Dirty_ControlValues = 4096
+HW_Dirty_Colors = 8192
+HW_Dirty_Names = 16384
+HW_Dirty_ChannelRackGroup = 32768
+HW_ChannelEvent = 65536
+
+# Song position modes
+SONGLENGTH_MS = 0
+SONGLENGTH_S = 1
+SONGLENGTH_ABSTICKS = 2
+SONGLENGTH_BARS = 3
+SONGLENGTH_STEPS = 4
+SONGLENGTH_TICKS = 5
+
+# Peak meter channels
+PEAK_L = 0
+PEAK_R = 1
+PEAK_LR = -1
+
+# Global transport commands
+FPT_Jog = 0
+FPT_Left = 7
+FPT_Right = 8
+FPT_Enter = 13
+FPT_Menu = 90
+FPT_F4 = 63
+FPT_F5 = 64
+FPT_F6 = 65
+FPT_F7 = 66
+FPT_F8 = 67
+FPT_F9 = 68
+FPT_F10 = 69
+FPT_F12 = 71
+FPT_TapTempo = 106
+FPT_Metronome = 110
+FPT_LoopRecord = 113
+FPT_CountDown = 115
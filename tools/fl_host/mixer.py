@@ -0,0 +1,96 @@
+""" Stand-in for the FL Studio `mixer` module. """
+
+import flhost
+from flhost import api
+import midi
+
+
+def _clamp(value, low, high):
+    return low if value < low else high if value > high else value
+
+
+@api("mixer")
+def trackCount():
+    return flhost.host.trackCount
+
+
+@api("mixer")
+def trackNumber():
+    return flhost.host.selectedTrack
+
+
+@api("mixer")
+def setTrackNumber(index, flags=0):
+    flhost.host.selectedTrack = index
+    flhost.host.notify(midi.HW_Dirty_Mixer_Sel | midi.HW_Dirty_LEDs)
+
+
+@api("mixer")
+def getTrackName(index):
+    return flhost.host.trackNames[index]
+
+
+@api("mixer")
+def getTrackVolume(index, mode=0):
+    return flhost.host.trackVolumes[index]
+
+
+@api("mixer")
+def setTrackVolume(index, value, pickupMode=0):
+    # FL Studio stores mixer volume with a resolution of 1/12800
+    flhost.host.trackVolumes[index] = round(_clamp(value, 0.0, 1.0) * 12800) / 12800
+    flhost.host.notify(midi.HW_Dirty_Mixer_Controls, index)
+
+
+@api("mixer")
+def getTrackPan(index):
+    return flhost.host.trackPans[index]
+
+
+@api("mixer")
+def setTrackPan(index, value, pickupMode=0):
+    flhost.host.trackPans[index] = round(_clamp(value, -1.0, 1.0) * 6400) / 6400
+    flhost.host.notify(midi.HW_Dirty_Mixer_Controls, index)
+
+
+@api("mixer")
+def isTrackArmed(index):
+    return flhost.host.trackArmed[index]
+
+
+@api("mixer")
+def isTrackSelected(index):
+    return flhost.host.trackSelected[index]
+
+
+@api("mixer")
+def selectTrack(index):
+    flhost.host.trackSelected[index] = int(not flhost.host.trackSelected[index])
+    flhost.host.notify(midi.HW_Dirty_Mixer_Sel, index)
+
+
+@api("mixer")
+def isTrackSolo(index):
+    return flhost.host.trackSolo[index]
+
+
+@api("mixer")
+def soloTrack(index, value=-1, mode=-1):
+    flhost.host.trackSolo[index] = int(not flhost.host.trackSolo[index]) if value == -1 else value
+    flhost.host.notify(midi.HW_Dirty_Mixer_Controls | midi.HW_Dirty_LEDs, index)
+
+
+@api("mixer")
+def isTrackMuted(index):
+    return flhost.host.trackMuted[index]
+
+
+@api("mixer")
+def muteTrack(index, value=-1):
+    flhost.host.trackMuted[index] = int(not flhost.host.trackMuted[index]) if value == -1 else value
+    flhost.host.notify(midi.HW_Dirty_Mixer_Controls | midi.HW_Dirty_LEDs, index)
+
+
+@api("mixer")
+def getTrackPeaks(index, mode):
+    return flhost.host.trackPeaks[index]
@@ -0,0 +1,30 @@
+"""
+Stand-in for the nihia (Native Instruments Host Integration Agent) library.
+
+Only the API surface used by the script is reproduced. Messages are sent through the stand-in `device.midiOutSysex` so
+they get counted and stored on `flhost.host.sysex`, but their byte layout is only an approximation of the real protocol.
+"""
+
+import device
+
+from nihia import buttons
+from nihia import mixer
+
+# Header shared by every SysEx message of the DAW integration protocol
+HEADER = [0xF0, 0x00, 0x21, 0x09, 0x00, 0x00, 0x44, 0x43, 0x01, 0x00]
+
+
+def dataOut(data1, data2):
+    device.midiOutSysex(bytes([0xF0, 0xBF, data1, data2, 0xF7]))
+
+
+def dataOutSysex(command, value, track, payload=b""):
+    device.midiOutSysex(bytes(HEADER + [command, value, track]) + bytes(payload) + b"\xF7")
+
+
+def handShake():
+    dataOutSysex(0x01, 0x01, 0x00, b"\x03")
+
+
+def goodBye():
+    dataOutSysex(0x02, 0x00, 0x00)
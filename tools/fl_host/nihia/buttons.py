@@ -0,0 +1,48 @@
+""" Stand-in for `nihia.buttons`. """
+
+import nihia
+
+button_list = {
+    "PLAY": 16,
+    "RESTART": 17,
+    "REC": 18,
+    "COUNT_IN": 19,
+    "STOP": 20,
+    "CLEAR": 21,
+    "LOOP": 22,
+    "METRO": 23,
+    "TEMPO": 24,
+
+    "UNDO": 32,
+    "REDO": 33,
+    "QUANTIZE": 34,
+    "AUTO": 35,
+
+    "TRACK_SELECT": 66,
+    "MUTE": 67,
+    "SOLO": 68,
+
+    "ENCODER_Y_S": 48,
+    "ENCODER_X_S": 50,
+    "ENCODER_Y_A": 48,
+    "ENCODER_X_A": 50,
+    "ENCODER_GENERAL": 52,
+    "ENCODER_BUTTON": 96,
+    "ENCODER_BUTTON_SHIFTED": 97,
+    "ENCODER_VOLUME_SELECTED": 100,
+    "ENCODER_PAN_SELECTED": 101,
+
+    "MUTE_SELECTED": 102,
+    "SOLO_SELECTED": 103,
+
+    "PLUS": 1,
+    "MINUS": 127,
+    "UP": 127,
+    "DOWN": 1,
+    "LEFT": 127,
+    "RIGHT": 1,
+}
+
+
+def setLight(buttonName, lightMode):
+    nihia.dataOut(button_list.get(buttonName), lightMode)
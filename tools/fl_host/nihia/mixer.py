@@ -0,0 +1,94 @@
+""" Stand-in for `nihia.mixer`. """
+
+import nihia
+
+# Knob CC numbers: [normal knobs (volume), shifted knobs (pan)]
+knobs = [
+    [80, 81, 82, 83, 84, 85, 86, 87],
+    [88, 89, 90, 91, 92, 93, 94, 95]
+]
+
+KNOB_INCREASE_MIN_SPEED = 1
+KNOB_INCREASE_MAX_SPEED = 63
+KNOB_DECREASE_MIN_SPEED = 127
+KNOB_DECREASE_MAX_SPEED = 65
+
+# Command bytes of the track information messages
+TRACK_AVAILABLE = 0x40
+TRACK_NAME = 0x48
+TRACK_VOL = 0x46
+TRACK_PAN = 0x47
+TRACK_VOL_GRAPH = 0x50
+TRACK_PAN_GRAPH = 0x51
+TRACK_ARM = 0x42
+TRACK_SEL = 0x45
+TRACK_SOLO = 0x44
+TRACK_MUTE = 0x43
+SELECTED_MUTE = 0x66
+SELECTED_SOLO = 0x67
+KOMPLETE_INSTANCE = 0x41
+PEAK_METERS = 0x49
+
+
+def _text(command, trackID, text):
+    nihia.dataOutSysex(command, 0, trackID, str(text).encode("ascii", "replace"))
+
+
+def _value(command, trackID, value):
+    nihia.dataOutSysex(command, int(value) & 0x7F, trackID)
+
+
+def setTrackExist(trackID, value):
+    _value(TRACK_AVAILABLE, trackID, value)
+
+
+def setTrackName(trackID, name):
+    _text(TRACK_NAME, trackID, name)
+
+
+def setTrackVol(trackID, value):
+    _text(TRACK_VOL, trackID, value)
+
+
+def setTrackPan(trackID, value):
+    _text(TRACK_PAN, trackID, value)
+
+
+def setTrackVolGraph(trackID, value):
+    _value(TRACK_VOL_GRAPH, trackID, round(value / 1.25 * 127))
+
+
+def setTrackPanGraph(trackID, value):
+    _value(TRACK_PAN_GRAPH, trackID, round((value + 1) / 2 * 127))
+
+
+def setTrackArm(trackID, value):
+    _value(TRACK_ARM, trackID, value)
+
+
+def setTrackSel(trackID, value):
+    _value(TRACK_SEL, trackID, value)
+
+
+def setTrackSolo(trackID, value):
+    _value(TRACK_SOLO, trackID, value)
+
+
+def setTrackMute(trackID, value):
+    _value(TRACK_MUTE, trackID, value)
+
+
+def setCurrentTrackMuted(value):
+    nihia.dataOut(SELECTED_MUTE, int(value))
+
+
+def setCurrentTrackSolo(value):
+    nihia.dataOut(SELECTED_SOLO, int(value))
+
+
+def setKompleteInstance(instance):
+    _text(KOMPLETE_INSTANCE, 0, instance)
+
+
+def sendPeakMeterData(peakValues: list):
+    nihia.dataOutSysex(PEAK_METERS, 2, 0, bytes(peakValues))
@@ -0,0 +1,51 @@
+""" Stand-in for the FL Studio `plugins` module. """
+
+import flhost
+from flhost import api
+import midi
+
+
+def _plugin(index, slotIndex=-1):
+    if slotIndex == -1:
+        return flhost.host.plugins[index]
+
+    return flhost.host.effects[(index, slotIndex)]
+
+
+@api("plugins")
+def isValid(index, slotIndex=-1):
+    if slotIndex == -1:
+        return index in flhost.host.plugins
+
+    return (index, slotIndex) in flhost.host.effects
+
+
+@api("plugins")
+def getPluginName(index, slotIndex=-1, userName=0):
+    return _plugin(index, slotIndex)[0]
+
+
+@api("plugins")
+def getParamCount(index, slotIndex=-1):
+    return len(_plugin(index, slotIndex)[1])
+
+
+@api("plugins")
+def getParamName(paramIndex, index, slotIndex=-1):
+    return _plugin(index, slotIndex)[1][paramIndex]
+
+
+@api("plugins")
+def getParamValue(paramIndex, index, slotIndex=-1):
+    return _plugin(index, slotIndex)[2][paramIndex]
+
+
+@api("plugins")
+def setParamValue(value, paramIndex, index, slotIndex=-1):
+    _plugin(index, slotIndex)[2][paramIndex] = min(max(value, 0.0), 1.0)
+    flhost.host.notify(midi.HW_Dirty_RemoteLinkValues)
+
+
+@api("plugins")
+def getParamValueString(paramIndex, index, slotIndex=-1):
+    return str(round(_plugin(index, slotIndex)[2][paramIndex] * 100)) + "%"
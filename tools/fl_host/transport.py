@@ -0,0 +1,80 @@
+""" Stand-in for the FL Studio `transport` module. """
+
+import flhost
+from flhost import api
+import midi
+
+
+@api("transport")
+def start():
+    flhost.host.playing = int(not flhost.host.playing)
+    flhost.host.notify(midi.HW_Dirty_LEDs)
+
+
+@api("transport")
+def stop():
+    flhost.host.playing = 0
+    flhost.host.songPos = 0
+    flhost.host.notify(midi.HW_Dirty_LEDs)
+
+
+@api("transport")
+def record():
+    flhost.host.recording = int(not flhost.host.recording)
+    flhost.host.notify(midi.HW_Dirty_LEDs | midi.HW_Dirty_Mixer_Controls)
+
+
+@api("transport")
+def isPlaying():
+    return flhost.host.playing
+
+
+@api("transport")
+def isRecording():
+    return flhost.host.recording
+
+
+@api("transport")
+def setLoopMode():
+    flhost.host.loopMode = int(not flhost.host.loopMode)
+
+
+@api("transport")
+def globalTransport(command, value, pmeflags=0, flags=0):
+    return 1
+
+
+def _ticksPerUnit(mode):
+    ppq = flhost.host.ppq
+
+    # Tempo is fixed at 120 BPM on the simulated session
+    if mode == midi.SONGLENGTH_MS:
+        return ppq * 2 / 1000
+    elif mode == midi.SONGLENGTH_S:
+        return ppq * 2
+    elif mode == midi.SONGLENGTH_BARS:
+        return ppq * 4
+    elif mode == midi.SONGLENGTH_STEPS:
+        return ppq / 4
+    return 1
+
+
+@api("transport")
+def getSongPos(mode=-1):
+    if mode == -1:
+        return flhost.host.songPos / flhost.host.songLength
+    return flhost.host.songPos / _ticksPerUnit(mode)
+
+
+@api("transport")
+def setSongPos(position, mode=-1):
+    if mode == -1:
+        ticks = position * flhost.host.songLength
+    else:
+        ticks = position * _ticksPerUnit(mode)
+    flhost.host.songPos = int(min(max(ticks, 0), flhost.host.songLength))
+
+
+@api("transport")
+def getSongLength(mode):
+    return flhost.host.songLength / _ticksPerUnit(mode)
@@ -0,0 +1,93 @@
+""" Stand-in for the FL Studio `ui` module. """
+
+import flhost
+from flhost import api
+import midi
+
+
+@api("ui")
+def getFocused(index):
+    return int(flhost.host.focused == index)
+
+
+@api("ui")
+def getFocusedFormID():
+    return flhost.host.focusedForm
+
+
+@api("ui")
+def setFocused(index):
+    flhost.host.focused = index
+
+
+@api("ui")
+def isPrecountEnabled():
+    return flhost.host.precount
+
+
+@api("ui")
+def isLoopRecEnabled():
+    return flhost.host.loopRec
+
+
+@api("ui")
+def isMetronomeEnabled():
+    return flhost.host.metronome
+
+
+@api("ui")
+def miDisplayRect(start, end, time, flags=0):
+    pass
+
+
+@api("ui")
+def crDisplayRect(left, top, right, bottom, duration, flags=0):
+    pass
+
+
+@api("ui")
+def showWindow(index):
+    flhost.host.focused = index
+
+
+@api("ui")
+def up(value=1):
+    pass
+
+
+@api("ui")
+def down(value=1):
+    pass
+
+
+def _moveSelectedTrack(offset):
+    # Moving left and right on the mixer changes the selected track
+    host = flhost.host
+
+    if host.focused == midi.widMixer:
+        previous = host.selectedTrack
+        host.selectedTrack = min(max(previous + offset, 0), host.trackCount - 1)
+        host.trackSelected[previous] = 0
+        host.trackSelected[host.selectedTrack] = 1
+        host.notify(midi.HW_Dirty_Mixer_Sel | midi.HW_Dirty_LEDs, previous)
+        host.notify(0, host.selectedTrack)
+
+
+@api("ui")
+def left(value=1):
+    _moveSelectedTrack(-1)
+
+
+@api("ui")
+def right(value=1):
+    _moveSelectedTrack(1)
+
+
+@api("ui")
+def enter():
+    pass
+
+
+@api("ui")
+def delete():
+    pass
@@ -0,0 +1 @@
+""" Stand-in for the FL Studio `utils` module. """
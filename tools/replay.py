@@ -0,0 +1,93 @@
+"""
+Replays a session recorded by the script on the offline FL Studio stand-in host.
+
+Feeds every MIDI message and callback stored on a recording made with `RECORDER = 1` on the config file to a fresh copy
+of the script, in the same order, and reports the latency, host API calls and messages sent to the device for every
+callback, along with the overall throughput.
+
+The notifications FL Studio sent during the session are part of the recording, so the ones the stand-in host queues
+when the script changes something are dropped instead of delivered. The values the script reads from the stand-in host
+are those of a default session, not the ones of the recorded session.
+
+Usage:
+    python tools/replay.py [--realtime] session.kkrec
+"""
+
+import argparse
+import os
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = os.path.dirname(TOOLS_DIR)
+sys.path.insert(0, TOOLS_DIR)
+
+import benchmark
+import flhost
+from flhost import MidiEvent
+
+sys.path.insert(1, SCRIPT_DIR)
+
+import recorder
+
+
+def replay(path: str, realtime: bool = False) -> tuple:
+    """ Replays a recording and returns the `benchmark.Benchmark` with the measurements and the wall time it took. """
+    deviceName, trackCount, dropped, records = recorder.load(path)
+
+    if dropped:
+        print("The recording is missing its first", dropped, "records, which got overwritten")
+
+    host = flhost.reset(deviceName=deviceName, trackCount=trackCount)
+    script = flhost.loadScript(SCRIPT_DIR)
+    measured = benchmark.Benchmark(script)
+
+    # Recordings that lost their beginning start on an initialized script anyway
+    if not records or recorder.CALLBACKS[records[0][1]] != "OnInit":
+        script.OnInit()
+
+    start = time.perf_counter()
+
+    for timestamp, callback, status, data1, data2, argument in records:
+        if realtime:
+            delay = timestamp - records[0][0] - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        name = recorder.CALLBACKS[callback]
+
+        if name == "OnMidiMsg":
+            measured.OnMidiMsg(MidiEvent(status, data1, data2))
+
+        elif name == "OnRefresh" or name == "OnDirtyMixerTrack":
+            measured.call(name, argument)
+
+        elif name in benchmark.CALLBACKS:
+            measured.call(name)
+
+        # OnInit and OnDeInit go straight to the controller, so a script with the recorder enabled doesn't overwrite
+        # the recording being replayed when it's closed
+        else:
+            getattr(script.keyboard, name)()
+
+        host.dirtyTracks = []
+        host.refreshFlags = 0
+
+    return measured, time.perf_counter() - start, len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("recording", help="Recording written by the script.")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Keep the timing of the recorded session instead of replaying as fast as possible.")
+    args = parser.parse_args()
+
+    measured, elapsed, count = replay(args.recording, args.realtime)
+
+    benchmark.printReport(measured, "{} ({} records in {:.2f} s, {:.0f} records/s)".format(
+        args.recording, count, elapsed, count / elapsed if elapsed > 0 else 0))
+
+
+if __name__ == "__main__":
+    main()